@@ -0,0 +1,811 @@
+"""
+Almacenes de tareas para el gestor de tareas (app.py).
+
+Todos exponen la misma interfaz (agregar, completar, listar, guardar, cargar)
+y se eligen con crear_almacen() según la configuración.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from itertools import islice
+
+try:
+    import fcntl
+except ImportError:  # Windows: solo queda el bloqueo entre hilos
+    fcntl = None
+
+import instantanea_binaria
+from indice_busqueda import terminos
+from indice_compacto import IndiceCompacto
+from indice_tareas import IndiceTareas
+
+
+class Almacen:
+    """Interfaz común de los almacenes de tareas."""
+
+    # Si se asigna, recibe (operación, segundos) de cada lectura o escritura en disco
+    observar_persistencia = None
+
+    @contextmanager
+    def _medir(self, operacion):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.observar_persistencia is not None:
+                self.observar_persistencia(operacion, time.perf_counter() - inicio)
+
+    def agregar(self, texto):
+        """Crea una tarea pendiente y devuelve su id."""
+        creadas, _ = self.aplicar_lote([texto], ())
+        return creadas[0]
+
+    def completar(self, id):
+        """Marca una tarea como hecha. Devuelve False si no existe o ya estaba hecha."""
+        _, completadas = self.aplicar_lote((), [id])
+        return bool(completadas)
+
+    def listar(self, despues_de=None, limite=None):
+        """
+        Recorre las pendientes en orden de creación y luego las completadas en orden de completado.
+
+        Con despues_de empieza tras esa tarea (paginación por cursor) y con
+        limite devuelve como mucho ese número de tareas. Devuelve una lista ya
+        leída, que no retiene conexiones ni depende de cambios posteriores.
+        """
+        raise NotImplementedError
+
+    def aplicar_lote(self, textos, ids):
+        """
+        Crea una tarea por texto y completa los ids dados en una sola operación.
+
+        Devuelve (ids creados, ids completados). Todo el lote se aplica bajo un
+        mismo bloqueo y se persiste de una vez.
+        """
+        raise NotImplementedError
+
+    def buscar(self, consulta, limite=None):
+        """
+        Tareas cuyo texto contiene todas las palabras de la consulta (una palabra
+        terminada en * busca por prefijo). Pendientes primero y luego completadas.
+        """
+        raise NotImplementedError
+
+    def contar(self):
+        """Devuelve (pendientes, completadas)."""
+        raise NotImplementedError
+
+    def version(self):
+        """
+        Identifica el estado de los datos para validar cachés y ETags: cambia con
+        cada cambio y coincide en todos los procesos que ven los mismos datos.
+        """
+        raise NotImplementedError
+
+    def ventana_durabilidad(self):
+        """Segundos que un cambio confirmado puede tardar en llegar a disco (0 si es inmediato)."""
+        return 0
+
+    def guardar(self):
+        """Fuerza la persistencia del estado actual."""
+
+    def cargar(self):
+        """Carga el estado persistido."""
+
+    def liberar(self):
+        """Devuelve lo que el hilo actual tenga prestado (p. ej. su conexión); se llama al final de cada petición."""
+
+    def cerrar(self):
+        """Libera archivos y conexiones."""
+
+
+class BloqueoArchivo:
+    """
+    Bloqueo consultivo entre procesos (flock) sobre un archivo .lock.
+
+    Es reentrante pero no excluye a los hilos del mismo proceso: se toma siempre
+    con el mutex del almacén ya tomado. Donde no hay fcntl (Windows) no bloquea nada.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._fd = None
+        self._profundidad = 0
+
+    def __enter__(self):
+        self._profundidad += 1
+        if fcntl is not None and self._profundidad == 1:
+            if self._fd is None:
+                self._fd = os.open(self.ruta, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        self._profundidad -= 1
+        if self._fd is not None and self._profundidad == 0:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def cerrar(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class AlmacenMemoria(Almacen):
+    """
+    Tareas en memoria con una instantánea JSON; las subclases deciden cuándo escribirla.
+
+    Los cambios se aplican bajo un mutex (hilos) y un bloqueo de archivo
+    (procesos). Antes de cada operación se incorpora lo que otros procesos hayan
+    escrito, así varios workers no repiten ids ni pisan cambios ajenos.
+    """
+
+    def __init__(self, ruta_datos, clase_indice=IndiceTareas, ruta_importar=None):
+        self.ruta_datos = ruta_datos
+        self.clase_indice = clase_indice
+        self.ruta_importar = ruta_importar
+        self.indice = clase_indice()
+        self.siguiente_id = 1
+        self._mutex = threading.RLock()
+        self._bloqueo_archivo = BloqueoArchivo(ruta_datos + '.lock')
+        self._bloqueo_busqueda = threading.Lock()  # un solo hilo construye el índice de búsqueda
+        # Contador local, para cuando solo un proceso usa los datos. Parte del reloj
+        # para que siga creciendo tras reiniciar el proceso
+        self._version = time.time_ns()
+
+    def aplicar_lote(self, textos, ids):
+        creadas, completadas, registros = [], [], []
+        with self._mutex, self._bloqueo_archivo:
+            self._sincronizar()
+            for texto in textos:
+                tarea = {'id': self.siguiente_id, 'texto': texto, 'hecho': False}
+                self.indice.agregar(tarea)
+                self.siguiente_id += 1
+                creadas.append(tarea['id'])
+                registros.append({'op': 'agregar', 'id': tarea['id'], 'texto': texto})
+            for id in ids:
+                if self.indice.completar(id):
+                    completadas.append(id)
+                    registros.append({'op': 'completar', 'id': id})
+            if registros:
+                self._version += 1
+                self._registrar(registros)
+        return creadas, completadas
+
+    def version(self):
+        with self._mutex, self._bloqueo_archivo:
+            self._sincronizar()
+            return self._version_datos()
+
+    def _version_datos(self):
+        """Versión del estado en memoria (con ambos bloqueos tomados)."""
+        return self._version
+
+    def listar(self, despues_de=None, limite=None):
+        with self._mutex, self._bloqueo_archivo:
+            self._sincronizar()
+            # La página se recorre con el mutex tomado: si otro hilo completa la tarea
+            # siguiente a mitad de recorrido, iterar() cortaría las pendientes y se saltarían
+            return list(islice(self.indice.iterar(despues_de), limite))
+
+    def buscar(self, consulta, limite=None):
+        if not self.indice.busqueda_preparada:
+            self._preparar_busqueda()
+        with self._mutex, self._bloqueo_archivo:
+            self._sincronizar()
+            return self.indice.buscar(consulta, limite)
+
+    def contar(self):
+        with self._mutex, self._bloqueo_archivo:
+            self._sincronizar()
+            return self.indice.num_pendientes, self.indice.num_completadas
+
+    def _sincronizar(self):
+        """Incorpora los cambios escritos por otros procesos (con ambos bloqueos tomados)."""
+
+    def _registrar(self, registros):
+        """Persiste de una vez una lista de cambios ya aplicados en memoria."""
+        raise NotImplementedError
+
+    def guardar(self):
+        with self._mutex, self._bloqueo_archivo, self._medir('guardar'):
+            escribir_instantanea(self.ruta_datos, self.indice, self.siguiente_id)
+
+    def cargar(self):
+        with self._mutex, self._bloqueo_archivo, self._medir('cargar'):
+            self._importar()
+            self.indice, self.siguiente_id = leer_instantanea(self.ruta_datos, self.clase_indice)
+
+    def _preparar_busqueda(self):
+        """
+        Construye el índice de búsqueda en la primera búsqueda, no al cargar: un
+        proceso que nunca busca no paga su memoria.
+
+        Lee otra copia de la instantánea sin el mutex, le construye el índice y,
+        ya bajo el mutex, se lo pasa al índice vivo poniéndolo al día con lo que
+        haya cambiado mientras tanto; así no frena escrituras ni listados.
+        """
+        with self._bloqueo_busqueda:
+            if self.indice.busqueda_preparada:
+                return
+            copia, _ = leer_instantanea(self.ruta_datos, self.clase_indice)
+            copia.preparar_busqueda()
+            with self._mutex:
+                self.indice.heredar_busqueda(copia)
+
+    def _importar(self):
+        """Si aún no hay instantánea, la crea a partir de ruta_importar (p. ej. JSON → binaria)."""
+        if self.ruta_importar and not os.path.exists(self.ruta_datos) and os.path.exists(self.ruta_importar):
+            indice, siguiente_id = leer_instantanea(self.ruta_importar, self.clase_indice)
+            escribir_instantanea(self.ruta_datos, indice, siguiente_id)
+
+    def cerrar(self):
+        self._bloqueo_archivo.cerrar()
+
+
+def leer_instantanea(ruta, clase_indice=IndiceTareas):
+    """
+    Lee una instantánea de tareas y devuelve (índice, siguiente_id).
+
+    Las binarias (.bin) se mapean en memoria y siempre dan un IndiceCompacto.
+    """
+    if ruta.endswith(instantanea_binaria.EXTENSION):
+        return instantanea_binaria.leer_binaria(ruta)
+    try:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return clase_indice(), 1
+    return clase_indice(data['tareas']), data['siguiente_id']
+
+
+def escribir_instantanea(ruta, tareas, siguiente_id, reemplazar=True):
+    """
+    Escribe las tareas en el orden del listado, sustituyendo el archivo de forma atómica.
+
+    Se escribe en un temporal y se renombra, así una caída nunca deja el archivo a
+    medias. El orden del listado conserva el de las completadas al volver a cargar.
+    El formato depende de la extensión (.bin binario, el resto JSON). Con
+    reemplazar=False se deja el temporal y se devuelve su ruta.
+    """
+    temporal = f'{ruta}.{os.getpid()}.tmp'
+    if ruta.endswith(instantanea_binaria.EXTENSION):
+        with open(temporal, 'wb') as f:
+            instantanea_binaria.escribir_binaria(f, tareas, siguiente_id)
+            f.flush()
+            os.fsync(f.fileno())
+    else:
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump({'siguiente_id': siguiente_id, 'tareas': list(tareas)}, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+    if not reemplazar:
+        return temporal
+    os.replace(temporal, ruta)
+    return ruta
+
+
+def firma_archivo(ruta):
+    """Identifica una versión concreta de un archivo (None si no existe)."""
+    try:
+        st = os.stat(ruta)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def huella(*partes):
+    """Texto corto que identifica una combinación de valores (p. ej. firmas de archivo), para ETags."""
+    return hashlib.blake2b(repr(partes).encode(), digest_size=8).hexdigest()
+
+
+class AlmacenJSON(AlmacenMemoria):
+    """
+    Reescribe el archivo JSON completo en cada cambio.
+
+    Con escritura diferida (intervalo_ms > 0) los cambios solo marcan el estado
+    como sucio y un hilo escribe una única vez por ráfaga: cuando pasan
+    intervalo_ms desde el primer cambio sin guardar o cuando se acumulan
+    max_cambios, lo que ocurra antes. En ese modo el archivo pertenece a un
+    único proceso.
+    """
+
+    def __init__(self, ruta_datos, intervalo_ms=0, max_cambios=1000, clase_indice=IndiceTareas, ruta_importar=None):
+        super().__init__(ruta_datos, clase_indice, ruta_importar)
+        self.intervalo = intervalo_ms / 1000
+        self.max_cambios = max_cambios
+        self._firma = None
+        self._sucios = 0
+        self._cerrando = False
+        self._condicion = threading.Condition(self._mutex)
+        self._bloqueo_escritura = threading.Lock()
+        self._hilo_escritura = None
+        if self.intervalo > 0:
+            self._hilo_escritura = threading.Thread(target=self._bucle_escritura, daemon=True)
+            self._hilo_escritura.start()
+
+    def _sincronizar(self):
+        if self._hilo_escritura is not None:
+            return
+        # Si otro proceso reescribió el archivo desde la última lectura o escritura, se recarga
+        firma = firma_archivo(self.ruta_datos)
+        if firma != self._firma:
+            anterior = self.indice
+            with self._medir('cargar'):
+                self.indice, self.siguiente_id = leer_instantanea(self.ruta_datos, self.clase_indice)
+            # El índice de búsqueda se conserva y se pone al día en vez de reconstruirlo
+            self.indice.heredar_busqueda(anterior)
+            self._firma = firma
+
+    def _version_datos(self):
+        if self._hilo_escritura is not None:
+            # El archivo es de este proceso y va por detrás de la memoria: vale el contador local
+            return self._version
+        # Cada cambio se escribe antes de responder, así que el estado es el del
+        # archivo y su firma es la misma para todos los procesos
+        return huella(self._firma)
+
+    def _registrar(self, registros):
+        if self._hilo_escritura is None:
+            self.guardar()
+            return
+        self._sucios += len(registros)
+        self._condicion.notify()
+
+    def ventana_durabilidad(self):
+        return self.intervalo
+
+    def cargar(self):
+        super().cargar()
+        self._firma = firma_archivo(self.ruta_datos)
+
+    def guardar(self):
+        if self._hilo_escritura is None:
+            with self._mutex, self._bloqueo_archivo:
+                super().guardar()
+                self._firma = firma_archivo(self.ruta_datos)
+        else:
+            self._volcar()
+
+    def _volcar(self):
+        """Copia el estado bajo el bloqueo y lo serializa fuera de él para no frenar las peticiones."""
+        with self._bloqueo_escritura:
+            with self._mutex:
+                tareas = self.indice.instantanea()
+                siguiente_id = self.siguiente_id
+                self._sucios = 0
+            with self._medir('guardar'):
+                escribir_instantanea(self.ruta_datos, tareas, siguiente_id)
+
+    def _bucle_escritura(self):
+        while True:
+            with self._condicion:
+                while not self._sucios and not self._cerrando:
+                    self._condicion.wait()
+                if not self._sucios:
+                    return
+                # Se espera al resto de la ráfaga hasta agotar el intervalo o llegar a max_cambios
+                limite = time.monotonic() + self.intervalo
+                while self._sucios < self.max_cambios and not self._cerrando:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        break
+                    self._condicion.wait(restante)
+            self._volcar()
+
+    def cerrar(self):
+        """Escribe lo pendiente y detiene el hilo de escritura."""
+        if self._hilo_escritura is not None:
+            with self._condicion:
+                self._cerrando = True
+                self._condicion.notify()
+            self._hilo_escritura.join()
+            self._hilo_escritura = None
+        super().cerrar()
+
+
+class AlmacenDiario(AlmacenMemoria):
+    """
+    Añade un registro por cambio a un diario y lo compacta en segundo plano.
+
+    Varios procesos pueden compartir el diario: cada uno recuerda hasta dónde lo
+    ha leído y aplica los registros ajenos antes de escribir los suyos.
+    """
+
+    def __init__(self, ruta_datos, umbral_compactacion=1024 * 1024, clase_indice=IndiceTareas, ruta_importar=None):
+        super().__init__(ruta_datos, clase_indice, ruta_importar)
+        base = os.path.splitext(ruta_datos)[0]
+        self.ruta_diario = base + '.diario.jsonl'
+        self.ruta_compactando = base + '.diario.compactando.jsonl'
+        self.umbral_compactacion = umbral_compactacion  # bytes
+        self._archivo = None
+        self._leido = 0  # bytes del diario actual ya aplicados
+        self._base = None  # firmas de la instantánea y del diario a medio compactar sobre los que se aplicó el diario
+        self._hilo_compactacion = None
+
+    def _abrir_diario(self):
+        if self._archivo is not None:
+            self._archivo.close()
+        self._archivo = open(self.ruta_diario, 'a+b')
+        self._leido = 0
+
+    def _fijar_base(self):
+        self._base = (firma_archivo(self.ruta_datos), firma_archivo(self.ruta_compactando))
+
+    def _version_datos(self):
+        # El estado en memoria es la base más los primeros _leido bytes de este
+        # diario: dos procesos con los mismos archivos y posición tienen los mismos datos
+        return huella(self._base, os.fstat(self._archivo.fileno()).st_ino, self._leido)
+
+    def _diario_rotado(self):
+        """True si el diario abierto ya no es el que está en ruta_diario (otro proceso lo rotó)."""
+        try:
+            return os.stat(self.ruta_diario).st_ino != os.fstat(self._archivo.fileno()).st_ino
+        except FileNotFoundError:
+            return True
+
+    def _sincronizar(self):
+        if self._archivo is None:
+            self._abrir_diario()
+        if self._diario_rotado():
+            # Lo rotado ya está o estará en la instantánea: se recarga todo
+            self._cargar()
+            return
+        self._archivo.seek(self._leido)
+        datos = self._archivo.read()
+        # Solo se aplican líneas completas
+        fin = datos.rfind(b'\n') + 1
+        if fin:
+            siguiente_id = aplicar_registros(self.indice, datos[:fin].splitlines())
+            self.siguiente_id = max(self.siguiente_id, siguiente_id)
+            self._leido += fin
+
+    def _registrar(self, registros):
+        """
+        Añade los registros al diario; el coste no depende del número de tareas.
+
+        Se hace fsync una vez por lote antes de responder, así que un cambio
+        confirmado sobrevive a una caída del sistema (ventana_durabilidad() es 0).
+        """
+        lineas = ''.join(json.dumps(registro, ensure_ascii=False) + '\n' for registro in registros)
+        with self._medir('diario'):
+            self._archivo.write(lineas.encode('utf-8'))
+            self._archivo.flush()
+            os.fsync(self._archivo.fileno())
+        # Con el bloqueo de archivo tomado nadie más ha escrito entre medias
+        self._leido = self._archivo.tell()
+        if self._leido >= self.umbral_compactacion:
+            self.iniciar_compactacion()
+
+    def cargar(self):
+        with self._mutex, self._bloqueo_archivo, self._medir('cargar'):
+            self._importar()
+            self._cargar()
+        if os.path.exists(self.ruta_compactando):
+            self.iniciar_compactacion()
+
+    def _cargar(self):
+        """Instantánea + diario a medio compactar (p. ej. tras una caída) + diario actual."""
+        anterior = self.indice
+        self._fijar_base()
+        self.indice, self.siguiente_id = leer_instantanea(self.ruta_datos, self.clase_indice)
+        try:
+            with open(self.ruta_compactando, 'rb') as f:
+                siguiente_id = aplicar_registros(self.indice, f)
+                self.siguiente_id = max(self.siguiente_id, siguiente_id)
+        except FileNotFoundError:
+            pass
+        self._abrir_diario()
+        self._sincronizar()
+        self.indice.heredar_busqueda(anterior)
+
+    def guardar(self):
+        # Cada cambio ya está en el diario; la instantánea la escribe la compactación
+        pass
+
+    def iniciar_compactacion(self):
+        """Rota el diario y lo funde con la instantánea en un hilo aparte."""
+        with self._mutex, self._bloqueo_archivo:
+            if self._hilo_compactacion is not None and self._hilo_compactacion.is_alive():
+                return
+            # Si quedó una compactación pendiente se termina antes de rotar otra vez
+            if not os.path.exists(self.ruta_compactando):
+                self._sincronizar()
+                self._archivo.close()
+                self._archivo = None
+                os.replace(self.ruta_diario, self.ruta_compactando)
+                self._abrir_diario()
+                # Lo aplicado es ahora la instantánea más el diario rotado, igual que al cargar de cero
+                self._fijar_base()
+            self._hilo_compactacion = threading.Thread(target=self.compactar, daemon=True)
+            self._hilo_compactacion.start()
+
+    def compactar(self):
+        """
+        Escribe una instantánea nueva con el diario rotado y lo elimina.
+
+        La lectura y la escritura se hacen sin bloqueos; si otro proceso compacta
+        a la vez, reaplicar registros es inocuo y solo uno sustituye los archivos.
+        """
+        with self._medir('compactar'):
+            firma = firma_archivo(self.ruta_compactando)
+            indice, siguiente_id = leer_instantanea(self.ruta_datos, self.clase_indice)
+            try:
+                with open(self.ruta_compactando, 'rb') as f:
+                    siguiente_id = max(siguiente_id, aplicar_registros(indice, f))
+            except FileNotFoundError:
+                # Otro proceso terminó esta compactación
+                return
+            temporal = escribir_instantanea(self.ruta_datos, indice, siguiente_id, reemplazar=False)
+        # Solo el cambio de archivos va bajo el bloqueo, y solo si nadie se adelantó
+        with self._mutex, self._bloqueo_archivo:
+            if firma_archivo(self.ruta_compactando) == firma:
+                os.replace(temporal, self.ruta_datos)
+                os.remove(self.ruta_compactando)
+            else:
+                os.remove(temporal)
+
+    def cerrar(self):
+        if self._hilo_compactacion is not None:
+            self._hilo_compactacion.join()
+        with self._mutex:
+            if self._archivo is not None:
+                self._archivo.close()
+                self._archivo = None
+        super().cerrar()
+
+
+def aplicar_registros(indice, lineas):
+    """Reproduce líneas de diario (bytes) sobre un índice de tareas y devuelve el siguiente id."""
+    siguiente_id = 1
+    for linea in lineas:
+        try:
+            registro = json.loads(linea)
+        except json.JSONDecodeError:
+            # Línea incompleta por una caída a mitad de escritura: se ignora
+            continue
+        if registro['op'] == 'agregar':
+            indice.agregar({'id': registro['id'], 'texto': registro['texto'], 'hecho': False})
+            siguiente_id = max(siguiente_id, registro['id'] + 1)
+        elif registro['op'] == 'completar':
+            indice.completar(registro['id'])
+    return siguiente_id
+
+
+class _ConexionPrestada:
+    """Conexión en uso por un hilo. Si el hilo termina sin devolverla, se cierra con él."""
+
+    __slots__ = ('conexion', '__weakref__')
+
+    def __init__(self, conexion):
+        self.conexion = conexion
+
+
+class AlmacenSQLite(Almacen):
+    """
+    Tareas en una base SQLite compartible entre procesos (p. ej. varios workers de gunicorn).
+
+    Usa modo WAL para que las lecturas no bloqueen a las escrituras. Cada hilo
+    toma una conexión de un grupo de libres (o abre una) y la devuelve en
+    liberar(); el grupo guarda como mucho max_libres, el resto se cierran. Así un
+    servidor con un hilo por petición no acumula conexiones ni descriptores.
+    """
+
+    # hecho = 0 para las pendientes; en las completadas guarda el orden en que se
+    # completaron (1, 2, 3...), así ORDER BY hecho, id usa el índice y lista igual
+    # que los almacenes en memoria.
+    ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS tareas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            texto TEXT NOT NULL,
+            hecho INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_tareas_hecho_id ON tareas (hecho, id);
+        CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor INTEGER NOT NULL);
+        INSERT OR IGNORE INTO meta VALUES ('version', 0);
+    """
+    SQL_AGREGAR = 'INSERT INTO tareas (texto) VALUES (?)'
+    SQL_COMPLETAR = 'UPDATE tareas SET hecho = (SELECT MAX(hecho) FROM tareas) + 1 WHERE id = ? AND hecho = 0'
+    SQL_VERSION = "SELECT valor FROM meta WHERE clave = 'version'"
+    # Índice de texto completo sobre tareas.texto; el disparador lo mantiene al
+    # insertar (el texto de una tarea no cambia después).
+    ESQUEMA_FTS = """
+        CREATE VIRTUAL TABLE tareas_fts USING fts5(
+            texto, content='tareas', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+        );
+        CREATE TRIGGER IF NOT EXISTS tareas_fts_agregar AFTER INSERT ON tareas BEGIN
+            INSERT INTO tareas_fts (rowid, texto) VALUES (new.id, new.texto);
+        END;
+        INSERT INTO tareas_fts (tareas_fts) VALUES ('rebuild');
+    """
+
+    def __init__(self, ruta_db, ruta_importar=None, timeout=30.0, max_libres=8):
+        self.ruta_db = ruta_db
+        self.ruta_importar = ruta_importar
+        self.timeout = timeout
+        self.max_libres = max_libres
+        self._local = threading.local()
+        self._libres = []
+        # Referencias débiles: la conexión de un hilo terminado desaparece con su threading.local
+        self._prestadas = weakref.WeakSet()
+        self._bloqueo = threading.Lock()
+        self._fts = False
+
+    def _conexion(self):
+        """Devuelve la conexión del hilo actual; la primera vez la toma del grupo de libres o la abre."""
+        prestada = getattr(self._local, 'prestada', None)
+        if prestada is None:
+            with self._bloqueo:
+                conexion = self._libres.pop() if self._libres else None
+            if conexion is None:
+                # Una conexión pasa de un hilo a otro, pero nunca la usan dos a la vez
+                conexion = sqlite3.connect(self.ruta_db, timeout=self.timeout, isolation_level=None,
+                                           check_same_thread=False)
+                conexion.execute('PRAGMA synchronous=NORMAL')
+            prestada = _ConexionPrestada(conexion)
+            self._local.prestada = prestada
+            with self._bloqueo:
+                self._prestadas.add(prestada)
+        return prestada.conexion
+
+    def liberar(self):
+        prestada = getattr(self._local, 'prestada', None)
+        if prestada is None:
+            return
+        del self._local.prestada
+        conexion = prestada.conexion
+        if conexion.in_transaction:
+            conexion.execute('ROLLBACK')
+        with self._bloqueo:
+            self._prestadas.discard(prestada)
+            if len(self._libres) < self.max_libres:
+                self._libres.append(conexion)
+                return
+        conexion.close()
+
+    def cargar(self):
+        with self._medir('cargar'):
+            conexion = self._conexion()
+            conexion.execute('PRAGMA journal_mode=WAL')
+            conexion.executescript(self.ESQUEMA)
+            self._fts = self._crear_fts(conexion)
+            if self.ruta_importar:
+                self._importar_json(conexion)
+
+    def _crear_fts(self, conexion):
+        """Crea el índice de texto completo si falta. Devuelve False si SQLite no trae FTS5."""
+        existe = conexion.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tareas_fts'").fetchone()
+        if existe:
+            return True
+        try:
+            # Una base de una versión anterior ya tiene tareas: 'rebuild' las indexa
+            conexion.executescript('BEGIN IMMEDIATE;' + self.ESQUEMA_FTS + 'COMMIT;')
+        except sqlite3.OperationalError as e:
+            if conexion.in_transaction:
+                conexion.execute('ROLLBACK')
+            if 'already exists' in str(e):
+                return True  # otro proceso lo creó a la vez
+            return False
+        return True
+
+    def _importar_json(self, conexion):
+        """Migra las tareas de un archivo JSON si la base está vacía."""
+        try:
+            with open(self.ruta_importar, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+        except FileNotFoundError:
+            return
+        conexion.execute('BEGIN IMMEDIATE')
+        try:
+            vacia = conexion.execute('SELECT NOT EXISTS (SELECT 1 FROM tareas)').fetchone()[0]
+            if vacia:
+                conexion.executemany(
+                    'INSERT INTO tareas (id, texto, hecho) VALUES (?, ?, ?)',
+                    [(t['id'], t['texto'], orden if t['hecho'] else 0)
+                     for orden, t in enumerate(datos['tareas'], start=1)],
+                )
+            conexion.execute('COMMIT')
+        except Exception:
+            conexion.execute('ROLLBACK')
+            raise
+
+    def aplicar_lote(self, textos, ids):
+        conexion = self._conexion()
+        creadas, completadas = [], []
+        with self._medir('guardar'):
+            conexion.execute('BEGIN IMMEDIATE')
+            try:
+                for texto in textos:
+                    creadas.append(conexion.execute(self.SQL_AGREGAR, (texto,)).lastrowid)
+                for id in ids:
+                    if conexion.execute(self.SQL_COMPLETAR, (id,)).rowcount > 0:
+                        completadas.append(id)
+                if creadas or completadas:
+                    # La versión es compartida por todos los procesos que usan la base
+                    conexion.execute("UPDATE meta SET valor = valor + 1 WHERE clave = 'version'")
+                conexion.execute('COMMIT')
+            except Exception:
+                conexion.execute('ROLLBACK')
+                raise
+        return creadas, completadas
+
+    def version(self):
+        return self._conexion().execute(self.SQL_VERSION).fetchone()[0]
+
+    def contar(self):
+        # Recorre solo el índice (hecho, id)
+        pendientes, completadas = self._conexion().execute(
+            'SELECT COUNT(*) FILTER (WHERE hecho = 0), COUNT(*) FILTER (WHERE hecho > 0) FROM tareas').fetchone()
+        return pendientes, completadas
+
+    def listar(self, despues_de=None, limite=None):
+        consulta = 'SELECT id, texto, hecho FROM tareas'
+        parametros = []
+        if despues_de is not None:
+            # El índice (hecho, id) resuelve tanto el cursor como el orden
+            consulta += ' WHERE (hecho, id) > (SELECT hecho, id FROM tareas WHERE id = ?)'
+            parametros.append(despues_de)
+        consulta += ' ORDER BY hecho, id'
+        if limite is not None:
+            consulta += ' LIMIT ?'
+            parametros.append(limite)
+        filas = self._conexion().execute(consulta, parametros)
+        # Se leen ya: en streaming la conexión vuelve al grupo al terminar la vista,
+        # antes de que la plantilla recorra la página
+        return [{'id': id, 'texto': texto, 'hecho': bool(hecho)} for id, texto, hecho in filas]
+
+    def buscar(self, consulta, limite=None):
+        palabras = terminos(consulta)
+        if not palabras:
+            return []
+        if self._fts:
+            # Cada palabra entre comillas para que FTS5 no la lea como operador
+            expresion = ' '.join(f'"{p}"*' if prefijo else f'"{p}"' for p, prefijo in palabras)
+            sql = ('SELECT t.id, t.texto, t.hecho FROM tareas_fts JOIN tareas t ON t.id = tareas_fts.rowid'
+                   ' WHERE tareas_fts MATCH ?')
+            parametros = [expresion]
+        else:
+            # Sin FTS5: recorrido completo con LIKE (no ignora tildes)
+            sql = 'SELECT t.id, t.texto, t.hecho FROM tareas t WHERE ' + ' AND '.join(['t.texto LIKE ?'] * len(palabras))
+            parametros = [f'%{p}%' for p, _ in palabras]
+        sql += ' ORDER BY t.hecho > 0, t.id'
+        if limite is not None:
+            sql += ' LIMIT ?'
+            parametros.append(limite)
+        filas = self._conexion().execute(sql, parametros)
+        return [{'id': id, 'texto': texto, 'hecho': bool(hecho)} for id, texto, hecho in filas]
+
+    def cerrar(self):
+        with self._bloqueo:
+            for conexion in self._libres + [p.conexion for p in self._prestadas]:
+                conexion.close()
+            self._libres.clear()
+            self._prestadas = weakref.WeakSet()
+        self._local = threading.local()
+
+
+def crear_almacen(config):
+    """Crea el almacén indicado en config['ALMACENAMIENTO'] ('json', 'diario' o 'sqlite')."""
+    tipo = config['ALMACENAMIENTO']
+    # Con MEMORIA_COMPACTA las tareas se guardan en columnas en vez de un diccionario por tarea
+    clase_indice = IndiceCompacto if config.get('MEMORIA_COMPACTA') else IndiceTareas
+    ruta_datos, ruta_importar = config['ARCHIVO_DATOS'], None
+    if config.get('INSTANTANEA_BINARIA'):
+        # La instantánea binaria (tareas.bin) se crea a partir del JSON la primera vez
+        ruta_datos = os.path.splitext(ruta_datos)[0] + instantanea_binaria.EXTENSION
+        ruta_importar, clase_indice = config['ARCHIVO_DATOS'], IndiceCompacto
+    if tipo == 'json':
+        return AlmacenJSON(ruta_datos, config['ESCRITURA_DIFERIDA_MS'], config['ESCRITURA_DIFERIDA_MAX'],
+                           clase_indice, ruta_importar)
+    if tipo == 'diario':
+        return AlmacenDiario(ruta_datos, config['UMBRAL_DIARIO'], clase_indice, ruta_importar)
+    if tipo == 'sqlite':
+        return AlmacenSQLite(config['ARCHIVO_SQLITE'], ruta_importar=config['ARCHIVO_DATOS'])
+    raise ValueError(f"Almacenamiento desconocido: {tipo!r}")
@@ -1,36 +1,226 @@
-import pandas as pd
-import matplotlib
-matplotlib.use('Agg')  # Backend no interactivo para evitar warnings
-import matplotlib.pyplot as plt
-
-# Leer el CSV
-df = pd.read_csv('datos.csv')
-
-print("Datos cargados:")
-print(df.head())
-print("\n" + "="*50 + "\n")
-
-# Calcular estadísticas para cada columna
-print("Estadísticas de col1:")
-print(f"  Media: {df['col1'].mean():.2f}")
-print(f"  Mediana: {df['col1'].median():.2f}")
-print(f"  Desviación estándar: {df['col1'].std():.2f}")
-
-print("\nEstadísticas de col2:")
-print(f"  Media: {df['col2'].mean():.2f}")
-print(f"  Mediana: {df['col2'].median():.2f}")
-print(f"  Desviación estándar: {df['col2'].std():.2f}")
-
-# Traza un scatter plot de col1 vs. col2
-plt.figure(figsize=(8, 6))
-plt.scatter(df['col1'], df['col2'], alpha=0.7, s=100, color='blue', edgecolors='black', linewidth=0.5)
-plt.xlabel('col1', fontsize=12)
-plt.ylabel('col2', fontsize=12)
-plt.title('Gráfica de Dispersión: col1 vs. col2', fontsize=14, fontweight='bold')
-plt.grid(True, alpha=0.3)
-plt.tight_layout()
-
-# Guardar la figura
-plt.savefig('grafica_dispersion.png', dpi=150, bbox_inches='tight')
-print("\nGráfica guardada como 'grafica_dispersion.png'")
-plt.close()  # Cerrar la figura para liberar memoria
+#!/usr/bin/env python3
+"""
+Estadísticas de las columnas numéricas de datos.csv y gráfica de dispersión.
+
+Las estadísticas salen de una sola pasada por bloques (estadisticas_streaming):
+media, desviación, mínimo y máximo exactos y mediana y cuantiles aproximados
+(exactos con pocos datos), así que el CSV puede ser mayor que la memoria.
+
+La gráfica también se hace por bloques. Hasta --umbral-puntos puntos es un
+scatter normal; por encima (modo auto) se acumula un histograma 2D de tamaño
+fijo con los mínimos y máximos ya calculados, o (--modo-grafica muestra) se
+dibuja una muestra uniforme de tamaño fijo (reservoir sampling). Así ni la
+memoria ni el tiempo de dibujo dependen del número de filas.
+
+Se puede importar (estadisticas(), densidad(), muestra(), graficar_*()) o usar
+desde la línea de comandos. pandas y matplotlib se importan solo al usarse:
+con --no-graficos o --informe json no se carga matplotlib.
+"""
+
+import argparse
+import json
+import math
+
+UMBRAL_PUNTOS = 50_000  # más puntos que esto no se dibujan uno a uno (modo auto)
+BINS = 200              # celdas por eje del histograma 2D
+TAMANO_MUESTRA = 20_000
+
+
+def estadisticas(ruta='datos.csv', filas_por_bloque=1_000_000, procesos=1):
+    """
+    ({columna: resumen}, primeras filas) de las columnas numéricas de ruta. El
+    resumen tiene n, media, mediana, desviacion, varianza, minimo, maximo y cuantiles.
+    """
+    from estadisticas_streaming import resumir_archivo
+    estados, primeras = resumir_archivo(ruta, filas_por_bloque, procesos)
+    return {columna: estado.resumen() for columna, estado in estados.items()}, primeras
+
+
+def _finitos(valor):
+    """Copia de valor con NaN e infinitos como None: JSON no admite NaN (columna vacía o sin datos)."""
+    if isinstance(valor, dict):
+        return {clave: _finitos(v) for clave, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_finitos(v) for v in valor]
+    if isinstance(valor, float) and not math.isfinite(valor):
+        return None
+    return valor
+
+
+def _columnas(ruta, x, y, filas_por_bloque):
+    """Bloques de las columnas x e y como arrays float64 sin filas con NaN."""
+    import numpy as np
+    import pandas as pd
+    from estadisticas_streaming import leer_en_bloques
+    for df in leer_en_bloques(ruta, filas_por_bloque, usecols=[x, y]):
+        vx = pd.to_numeric(df[x], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        vy = pd.to_numeric(df[y], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        validos = ~(np.isnan(vx) | np.isnan(vy))
+        yield vx[validos], vy[validos]
+
+
+def puntos(ruta, x='col1', y='col2', filas_por_bloque=1_000_000):
+    """DataFrame con todas las filas de x e y (solo para archivos pequeños)."""
+    import pandas as pd
+    from estadisticas_streaming import leer_en_bloques
+    return pd.concat(list(leer_en_bloques(ruta, filas_por_bloque, usecols=[x, y])), ignore_index=True)
+
+
+def densidad(ruta, x, y, rango_x, rango_y, bins=BINS, filas_por_bloque=1_000_000):
+    """
+    Histograma 2D (conteos, bordes_x, bordes_y) de x frente a y acumulado por
+    bloques. Los rangos (mínimo, máximo) fijan los bordes antes de leer.
+    """
+    import numpy as np
+    rangos = [(a, b) if a < b else (a - 0.5, b + 0.5) for a, b in (rango_x, rango_y)]
+    conteos = np.zeros((bins, bins))
+    bordes_x, bordes_y = np.linspace(*rangos[0], bins + 1), np.linspace(*rangos[1], bins + 1)
+    for vx, vy in _columnas(ruta, x, y, filas_por_bloque):
+        conteos += np.histogram2d(vx, vy, bins=(bordes_x, bordes_y))[0]
+    return conteos, bordes_x, bordes_y
+
+
+def muestra(ruta, x, y, tamano=TAMANO_MUESTRA, semilla=None, filas_por_bloque=1_000_000):
+    """
+    Muestra uniforme sin reemplazo de tamano puntos (arrays x, y). Cada punto
+    recibe una clave aleatoria y se quedan las tamano menores (reservoir
+    sampling por bloques): la memoria es la de la muestra más un bloque.
+    """
+    import numpy as np
+    rng = np.random.default_rng(semilla)
+    claves, mx, my = np.empty(0), np.empty(0), np.empty(0)
+    for vx, vy in _columnas(ruta, x, y, filas_por_bloque):
+        claves = np.concatenate([claves, rng.random(len(vx))])
+        mx, my = np.concatenate([mx, vx]), np.concatenate([my, vy])
+        if len(claves) > tamano:
+            quedan = np.argpartition(claves, tamano)[:tamano]
+            claves, mx, my = claves[quedan], mx[quedan], my[quedan]
+    return mx, my
+
+
+def graficar_dispersion(df, ruta='grafica_dispersion.png', x='col1', y='col2'):
+    import matplotlib
+    matplotlib.use('Agg')  # Backend no interactivo para evitar warnings
+    import matplotlib.pyplot as plt
+
+    # Traza un scatter plot de col1 vs. col2
+    plt.figure(figsize=(8, 6))
+    plt.scatter(df[x], df[y], alpha=0.7, s=100, color='blue', edgecolors='black', linewidth=0.5)
+    plt.xlabel(x, fontsize=12)
+    plt.ylabel(y, fontsize=12)
+    plt.title(f'Gráfica de Dispersión: {x} vs. {y}', fontsize=14, fontweight='bold')
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+
+    # Guardar la figura
+    plt.savefig(ruta, dpi=150, bbox_inches='tight')
+    plt.close()  # Cerrar la figura para liberar memoria
+
+
+def graficar_densidad(conteos, bordes_x, bordes_y, ruta='grafica_dispersion.png', x='col1', y='col2'):
+    """Histograma 2D en escala logarítmica; las celdas vacías quedan en blanco."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import numpy as np
+    from matplotlib.colors import LogNorm
+
+    plt.figure(figsize=(8, 6))
+    plt.pcolormesh(bordes_x, bordes_y, np.ma.masked_equal(conteos, 0).T, norm=LogNorm(), cmap='viridis')
+    plt.colorbar(label='Puntos por celda')
+    plt.xlabel(x, fontsize=12)
+    plt.ylabel(y, fontsize=12)
+    plt.title(f'Densidad: {x} vs. {y} ({int(conteos.sum()):,} puntos)', fontsize=14, fontweight='bold')
+    plt.tight_layout()
+    plt.savefig(ruta, dpi=150, bbox_inches='tight')
+    plt.close()
+
+
+def graficar_muestra(mx, my, total, ruta='grafica_dispersion.png', x='col1', y='col2'):
+    """Scatter de una muestra con puntos pequeños, sin borde y rasterizados."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(8, 6))
+    plt.scatter(mx, my, s=2, alpha=0.3, color='blue', linewidths=0, rasterized=True)
+    plt.xlabel(x, fontsize=12)
+    plt.ylabel(y, fontsize=12)
+    plt.title(f'Muestra: {x} vs. {y} ({len(mx):,} de {total:,} puntos)', fontsize=14, fontweight='bold')
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(ruta, dpi=150, bbox_inches='tight')
+    plt.close()
+
+
+def graficar(ruta, resultado, modo='auto', umbral=UMBRAL_PUNTOS, bins=BINS, tamano_muestra=TAMANO_MUESTRA,
+             filas_por_bloque=1_000_000, salida='grafica_dispersion.png'):
+    """
+    Gráfica de las dos primeras columnas numéricas de resultado (de
+    estadisticas()) en el modo pedido; auto elige 'puntos' hasta umbral y
+    'densidad' por encima. Devuelve el modo usado.
+    """
+    x, y = list(resultado)[:2]
+    total = max(resultado[x]['n'], resultado[y]['n'])
+    if modo == 'auto':
+        modo = 'puntos' if total <= umbral else 'densidad'
+    if modo == 'puntos':
+        graficar_dispersion(puntos(ruta, x, y, filas_por_bloque), salida, x, y)
+    elif modo == 'densidad':
+        rango_x = (resultado[x]['minimo'], resultado[x]['maximo'])
+        rango_y = (resultado[y]['minimo'], resultado[y]['maximo'])
+        graficar_densidad(*densidad(ruta, x, y, rango_x, rango_y, bins, filas_por_bloque), salida, x, y)
+    else:
+        graficar_muestra(*muestra(ruta, x, y, tamano_muestra, filas_por_bloque=filas_por_bloque),
+                         total, salida, x, y)
+    return modo
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Estadísticas de las columnas numéricas y gráfica de dispersión.")
+    parser.add_argument("-a", "--archivo", default="datos.csv", help="CSV de datos (por defecto: datos.csv)")
+    parser.add_argument("--no-graficos", action="store_true", help="Solo las estadísticas, sin gráfica")
+    parser.add_argument("--informe", choices=["texto", "json"], default="texto",
+                        help="texto: legible; json: estadísticas en JSON, sin gráfica (por defecto: texto)")
+    parser.add_argument("--filas-por-bloque", type=int, default=1_000_000,
+                        help="Filas que se leen de una vez (por defecto: 1000000)")
+    parser.add_argument("-j", "--procesos", type=int, default=1,
+                        help="Procesos que reparten el archivo por rangos de bytes; 0 = uno por núcleo (por defecto: 1)")
+    parser.add_argument("--modo-grafica", choices=["auto", "puntos", "densidad", "muestra"], default="auto",
+                        help="puntos: un punto por fila; densidad: histograma 2D; muestra: reservoir sampling; "
+                             "auto: puntos hasta --umbral-puntos y densidad por encima (por defecto: auto)")
+    parser.add_argument("--umbral-puntos", type=int, default=UMBRAL_PUNTOS,
+                        help=f"Máximo de puntos dibujados uno a uno en modo auto (por defecto: {UMBRAL_PUNTOS})")
+    parser.add_argument("--bins", type=int, default=BINS,
+                        help=f"Celdas por eje del histograma 2D (por defecto: {BINS})")
+    parser.add_argument("--tamano-muestra", type=int, default=TAMANO_MUESTRA,
+                        help=f"Puntos de la muestra (por defecto: {TAMANO_MUESTRA})")
+    args = parser.parse_args(argv)
+
+    # Leer el CSV por bloques y resumir todas las columnas numéricas a la vez
+    resultado, primeras = estadisticas(args.archivo, args.filas_por_bloque, args.procesos)
+    if args.informe == 'json':
+        print(json.dumps(_finitos(resultado), ensure_ascii=False, indent=2, allow_nan=False))
+        return
+
+    print("Datos cargados:")
+    print(primeras)
+    print("\n" + "="*50 + "\n")
+
+    # Estadísticas de cada columna
+    for i, (columna, e) in enumerate(resultado.items()):
+        if i:
+            print()
+        print(f"Estadísticas de {columna}:")
+        print(f"  Media: {e['media']:.2f}")
+        print(f"  Mediana: {e['mediana']:.2f}")
+        print(f"  Desviación estándar: {e['desviacion']:.2f}")
+
+    if not args.no_graficos and len(resultado) >= 2:
+        modo = graficar(args.archivo, resultado, args.modo_grafica, args.umbral_puntos, args.bins,
+                        args.tamano_muestra, args.filas_por_bloque)
+        print("\nGráfica guardada como 'grafica_dispersion.png'" + ("" if modo == 'puntos' else f" ({modo})"))
+
+
+if __name__ == "__main__":
+    main()
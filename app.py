@@ -1,51 +1,228 @@
-import json
-from flask import Flask, request, redirect, render_template
+import atexit
+import cProfile
+import os
+import threading
+import time
+from flask import Flask, request, redirect, render_template, stream_template, jsonify, make_response, g
+from almacenamiento import crear_almacen
+from metricas import Registro, Contador, Histograma, Indicador
 
 app = Flask(__name__)
 
-# Estructura de datos en memoria
-tareas = []
-siguiente_id = 1
-ARCHIVO_DATOS = 'tareas.json'
+# Configuración (se puede sobrescribir con variables de entorno TAREAS_*,
+# p. ej. TAREAS_ALMACENAMIENTO=sqlite)
+app.config.update(
+    ALMACENAMIENTO='json',        # 'json', 'diario' o 'sqlite'
+    ARCHIVO_DATOS='tareas.json',
+    ARCHIVO_SQLITE='tareas.db',
+    UMBRAL_DIARIO=1024 * 1024,    # bytes antes de compactar el diario
+    ESCRITURA_DIFERIDA_MS=0,      # >0: agrupar escrituras de 'json' en un hilo aparte
+    ESCRITURA_DIFERIDA_MAX=1000,  # cambios que fuerzan la escritura antes del intervalo
+    MEMORIA_COMPACTA=False,       # 'json'/'diario': tareas en columnas (menos memoria con millones)
+    INSTANTANEA_BINARIA=False,    # 'json'/'diario': tareas.bin mapeado en memoria (arranque rápido)
+    POR_PAGINA=100,
+    MAX_POR_PAGINA=10000,
+    STREAMING=False,              # enviar el listado a medida que se renderiza
+    MAX_LOTE=10000,               # operaciones por petición en /api/tareas
+    CACHE_PAGINAS=256,            # páginas renderizadas que se guardan por versión
+    PERFILAR=False,               # cProfile en todas las peticiones
+    PERFILAR_CABECERA=False,      # cProfile solo en las peticiones con cabecera X-Perfilar
+    CARPETA_PERFILES='perfiles',  # dónde se guardan los .prof
+)
+app.config.from_prefixed_env('TAREAS')
 
-# Funciones para manejar tareas
+almacen = crear_almacen(app.config)
+
+# Métricas (se exponen en /metrics en formato Prometheus)
+metricas = Registro()
+latencia_rutas = metricas.registrar(Histograma(
+    'tareas_peticion_segundos', 'Duración de las peticiones por ruta', ('ruta', 'metodo')))
+peticiones_total = metricas.registrar(Contador(
+    'tareas_peticiones_total', 'Peticiones atendidas por ruta y código de estado', ('ruta', 'metodo', 'estado')))
+duracion_persistencia = metricas.registrar(Histograma(
+    'tareas_persistencia_segundos', 'Lecturas y escrituras del almacén en disco', ('operacion',)))
+duracion_render = metricas.registrar(Histograma(
+    'tareas_render_segundos', 'Tiempo de renderizado de las plantillas', ('plantilla',)))
+metricas.registrar(Indicador(
+    'tareas_total', 'Tareas por estado', ('estado',),
+    lambda: dict(zip([('pendiente',), ('completada',)], almacen.contar()))))
+almacen.observar_persistencia = lambda operacion, segundos: duracion_persistencia.observar(segundos, operacion)
+
+class CachePaginas:
+    """HTML ya renderizado de cada página, válido solo para una versión de los datos."""
+
+    def __init__(self, max_entradas):
+        self.max_entradas = max_entradas
+        self._version = None
+        self._paginas = {}
+        self._bloqueo = threading.Lock()
+
+    def obtener(self, version, clave):
+        with self._bloqueo:
+            if version != self._version:
+                return None
+            return self._paginas.get(clave)
+
+    def guardar(self, version, clave, html):
+        with self._bloqueo:
+            if version != self._version or len(self._paginas) >= self.max_entradas:
+                self._version = version
+                self._paginas = {}
+            self._paginas[clave] = html
+
+    def invalidar(self):
+        with self._bloqueo:
+            self._version = None
+            self._paginas = {}
+
+cache_paginas = CachePaginas(app.config['CACHE_PAGINAS'])
+
+# Funciones para manejar tareas (cada cambio sube la versión de los datos)
 def agregar_tarea(texto):
-    global siguiente_id
-    tareas.append({'id': siguiente_id, 'texto': texto, 'hecho': False})
-    siguiente_id += 1
-    guardar_datos()
+    id = almacen.agregar(texto)
+    cache_paginas.invalidar()
+    return id
 
 def completar_tarea(id):
-    for tarea in tareas:
-        if tarea['id'] == id:
-            tarea['hecho'] = True
-            guardar_datos()
-            break
+    completada = almacen.completar(id)
+    if completada:
+        cache_paginas.invalidar()
+    return completada
+
+def aplicar_lote(textos, ids):
+    creadas, completadas = almacen.aplicar_lote(textos, ids)
+    if creadas or completadas:
+        cache_paginas.invalidar()
+    return creadas, completadas
 
-# Persistencia con JSON
+# Persistencia
 def guardar_datos():
-    with open(ARCHIVO_DATOS, 'w', encoding='utf-8') as f:
-        json.dump({'siguiente_id': siguiente_id, 'tareas': tareas}, f, ensure_ascii=False, indent=2)
+    almacen.guardar()
 
 def cargar_datos():
-    global siguiente_id, tareas
-    try:
-        with open(ARCHIVO_DATOS, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            tareas = data['tareas']
-            siguiente_id = data['siguiente_id']
-    except FileNotFoundError:
-        pass
-
-# Cargar datos al iniciar
+    almacen.cargar()
+
+# Cargar datos al iniciar y escribir lo pendiente al salir
 cargar_datos()
+atexit.register(almacen.cerrar)
+if almacen.ventana_durabilidad():
+    app.logger.warning('Escritura diferida: los cambios de los últimos %.0f ms se pierden si el proceso cae',
+                       almacen.ventana_durabilidad() * 1000)
+
+class Pagina:
+    """
+    Recorre una página del listado y al terminar sabe si hay más tareas.
+
+    Se consume dentro de la plantilla, así que funciona igual al renderizar
+    de una vez que en streaming.
+    """
+
+    def __init__(self, despues_de, limite):
+        self.limite = limite
+        self.siguiente = None
+        # Se pide una tarea de más para saber si hay página siguiente
+        self._tareas = almacen.listar(despues_de, limite + 1)
+
+    def __iter__(self):
+        ultimo = None
+        for i, tarea in enumerate(self._tareas):
+            if i == self.limite:
+                self.siguiente = ultimo
+                break
+            ultimo = tarea['id']
+            yield tarea
+
+def renderizar(plantilla, **contexto):
+    with duracion_render.medir(plantilla):
+        return render_template(plantilla, **contexto)
+
+def renderizar_en_streaming(plantilla, **contexto):
+    """Como stream_template, pero mide solo el tiempo de generar los trozos (no el de enviarlos)."""
+    # stream_template necesita el contexto de la petición: se llama ya, no al empezar a recorrer
+    trozos = stream_template(plantilla, **contexto)
+
+    def medir():
+        total = 0.0
+        while True:
+            inicio = time.perf_counter()
+            try:
+                trozo = next(trozos)
+            except StopIteration:
+                break
+            finally:
+                total += time.perf_counter() - inicio
+            yield trozo
+        duracion_render.observar(total, plantilla)
+    return medir()
+
+def parametros_pagina():
+    """Lee ?after=<id>&limit=N de la petición actual."""
+    despues_de = request.args.get('after', type=int)
+    limite = request.args.get('limit', app.config['POR_PAGINA'], type=int)
+    return despues_de, max(1, min(limite, app.config['MAX_POR_PAGINA']))
+
+# Medición de cada petición
+bloqueo_perfilador = threading.Lock()  # cProfile no admite dos perfiles activos a la vez
+
+@app.before_request
+def iniciar_medicion():
+    g.inicio = time.perf_counter()
+    if app.config['PERFILAR'] or (app.config['PERFILAR_CABECERA'] and 'X-Perfilar' in request.headers):
+        # Si ya hay otra petición perfilándose, esta se atiende sin perfil
+        if bloqueo_perfilador.acquire(blocking=False):
+            g.perfilador = cProfile.Profile()
+            g.perfilador.enable()
+
+@app.after_request
+def registrar_medicion(respuesta):
+    # La regla ('/completar/<int:id>') y no la URL, para no crear una serie por id
+    ruta = request.url_rule.rule if request.url_rule else 'desconocida'
+    latencia_rutas.observar(time.perf_counter() - g.inicio, ruta, request.method)
+    peticiones_total.incrementar(ruta, request.method, respuesta.status_code)
+    return respuesta
+
+@app.teardown_appcontext
+def liberar_almacen(error):
+    # Devuelve la conexión SQLite del hilo al grupo (los hilos por petición no la acumulan).
+    # En streaming se ejecuta al volver la vista, antes de recorrer la plantilla: por eso
+    # almacen.listar() devuelve la página ya leída en vez de un cursor abierto
+    almacen.liberar()
+
+@app.teardown_request
+def guardar_perfil(error):
+    perfilador = g.pop('perfilador', None)
+    if perfilador is None:
+        return
+    perfilador.disable()
+    bloqueo_perfilador.release()
+    os.makedirs(app.config['CARPETA_PERFILES'], exist_ok=True)
+    ruta = os.path.join(app.config['CARPETA_PERFILES'],
+                        f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{time.perf_counter_ns()}-{request.endpoint}.prof")
+    perfilador.dump_stats(ruta)
+    app.logger.info('Perfil de %s %s guardado en %s', request.method, request.path, ruta)
 
 # Rutas
 @app.route('/')
 def index():
-    # Ordenar tareas: incompletas primero, luego completadas
-    tareas_ordenadas = sorted(tareas, key=lambda t: t['hecho'])
-    return render_template('index.html', tareas=tareas_ordenadas)
+    # Incompletas primero, luego completadas; ?after=<id>&limit=N para paginar
+    despues_de, limite = parametros_pagina()
+    # La versión de los datos sirve de ETag: sin cambios no hace falta ni renderizar
+    version = almacen.version()
+    etag = str(version)
+    if request.if_none_match.contains(etag):
+        respuesta = make_response('', 304)
+    elif app.config['STREAMING']:
+        respuesta = make_response(renderizar_en_streaming('index.html', pagina=Pagina(despues_de, limite)))
+    else:
+        html = cache_paginas.obtener(version, (despues_de, limite))
+        if html is None:
+            html = renderizar('index.html', pagina=Pagina(despues_de, limite))
+            cache_paginas.guardar(version, (despues_de, limite), html)
+        respuesta = make_response(html)
+    respuesta.set_etag(etag)
+    # El navegador puede guardar la página pero debe revalidarla en cada visita
+    respuesta.headers['Cache-Control'] = 'no-cache'
+    return respuesta
 
 @app.route('/agregar', methods=['POST'])
 def agregar():
@@ -59,5 +236,52 @@ def completar(id):
     completar_tarea(id)
     return redirect('/')
 
+@app.route('/buscar')
+def buscar():
+    # Todas las palabras deben aparecer; "palabra*" busca por prefijo
+    consulta = request.args.get('q', '').strip()
+    _, limite = parametros_pagina()
+    tareas = almacen.buscar(consulta, limite) if consulta else []
+    return renderizar('index.html', pagina=tareas, consulta=consulta)
+
+# API JSON
+@app.route('/api/tareas')
+def api_listar():
+    despues_de, limite = parametros_pagina()
+    tareas = list(almacen.listar(despues_de, limite + 1))
+    siguiente = tareas[limite - 1]['id'] if len(tareas) > limite else None
+    return jsonify(tareas=tareas[:limite], siguiente=siguiente)
+
+@app.route('/api/tareas/buscar')
+def api_buscar():
+    consulta = request.args.get('q', '').strip()
+    if not consulta:
+        return jsonify(error="Falta el parámetro 'q'"), 400
+    _, limite = parametros_pagina()
+    return jsonify(tareas=almacen.buscar(consulta, limite))
+
+@app.route('/api/tareas', methods=['POST'])
+def api_lote():
+    """Aplica un lote: {"agregar": ["texto", ...], "completar": [id, ...]}."""
+    datos = request.get_json(silent=True)
+    if not isinstance(datos, dict):
+        return jsonify(error='Se esperaba un objeto JSON'), 400
+    textos = datos.get('agregar', [])
+    ids = datos.get('completar', [])
+    if not isinstance(textos, list) or not all(isinstance(t, str) and t.strip() for t in textos):
+        return jsonify(error="'agregar' debe ser una lista de textos no vacíos"), 400
+    if not isinstance(ids, list) or not all(type(id) is int for id in ids):
+        return jsonify(error="'completar' debe ser una lista de ids enteros"), 400
+    if len(textos) + len(ids) > app.config['MAX_LOTE']:
+        return jsonify(error=f"El lote supera el máximo de {app.config['MAX_LOTE']} operaciones"), 413
+    creadas, completadas = aplicar_lote([t.strip() for t in textos], ids)
+    return jsonify(creadas=creadas, completadas=completadas), 201 if creadas else 200
+
+@app.route('/metrics')
+def exportar_metricas():
+    respuesta = make_response(metricas.exportar())
+    respuesta.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+    return respuesta
+
 if __name__ == '__main__':
     app.run(debug=True)
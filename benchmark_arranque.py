@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark de arranque en frío del gestor de tareas (app.py).
+
+Para cada tamaño prepara tareas.json en una carpeta temporal y arranca la app en
+un proceso nuevo con cada modo de carga: JSON con diccionarios, JSON con memoria
+compacta e instantánea binaria mapeada en memoria (que se genera antes, como
+tras un reinicio normal). Mide por separado importar Flask, importar la app
+(que carga los datos) y servir la primera página.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+DIRECTORIO_APP = Path(__file__).resolve().parent
+
+MODOS = {
+    'json': {},
+    'compacta': {'TAREAS_MEMORIA_COMPACTA': 'true'},
+    'binaria': {'TAREAS_INSTANTANEA_BINARIA': 'true'},
+}
+
+
+def arrancar(carpeta, entorno, cola):
+    """Proceso hijo: importa la app en la carpeta de datos y pide la primera página."""
+    try:
+        os.chdir(carpeta)
+        os.environ.update(entorno)
+        sys.path.insert(0, str(DIRECTORIO_APP))
+        inicio = time.perf_counter()
+        import flask  # noqa: F401
+        importar_flask = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        import app
+        cargar = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        respuesta = app.app.test_client().get('/')
+        primera_pagina = time.perf_counter() - inicio
+        assert respuesta.status_code == 200
+        app.almacen.cerrar()
+        cola.put({
+            'importar_flask_s': round(importar_flask, 4),
+            'cargar_s': round(cargar, 4),
+            'primera_pagina_s': round(primera_pagina, 4),
+            'total_s': round(importar_flask + cargar + primera_pagina, 4),
+        })
+    except Exception as e:
+        cola.put({'error': repr(e)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide el arranque en frío con cada modo de carga.")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[1_000, 100_000, 1_000_000],
+                        help="Número de tareas (por defecto: 1k, 100k y 1M)")
+    parser.add_argument("-m", "--modos", nargs="+", choices=list(MODOS), default=list(MODOS),
+                        help="Modos a medir (por defecto: todos)")
+    parser.add_argument("-o", "--salida", help="Archivo JSON donde guardar los resultados")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(DIRECTORIO_APP))
+    from benchmark_tareas import sembrar
+    from instantanea_binaria import EXTENSION
+
+    contexto = multiprocessing.get_context('spawn')
+    resultados = []
+    print(f"{'modo':<10} {'tareas':>10} {'flask s':>9} {'cargar s':>9} {'1ª página s':>12} {'total s':>9}")
+    for n in args.tamanos:
+        with tempfile.TemporaryDirectory() as carpeta:
+            os.chdir(carpeta)
+            sembrar(n)
+            if 'binaria' in args.modos:
+                from almacenamiento import leer_instantanea, escribir_instantanea
+                from indice_compacto import IndiceCompacto
+                escribir_instantanea('tareas' + EXTENSION, *leer_instantanea('tareas.json', IndiceCompacto))
+            os.chdir(DIRECTORIO_APP)
+            for modo in args.modos:
+                cola = contexto.Queue()
+                proceso = contexto.Process(target=arrancar, args=(carpeta, MODOS[modo], cola))
+                proceso.start()
+                r = cola.get()
+                proceso.join()
+                resultados.append({'modo': modo, 'tareas': n, **r})
+                if 'error' in r:
+                    print(f"{modo:<10} {n:>10} ❌ {r['error']}")
+                    continue
+                print(f"{modo:<10} {n:>10} {r['importar_flask_s']:>9} {r['cargar_s']:>9} "
+                      f"{r['primera_pagina_s']:>12} {r['total_s']:>9}")
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+        print(f"\n✅ Resultados guardados en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark de carga del CSV de ventas: tipos inferidos frente a esquema explícito.
+
+Cada modo se mide en un proceso nuevo para que el pico de memoria residente
+(VmHWM, descontando lo que ocupan los imports) sea solo el de la carga:
+
+- inferido: leer_ventas() y pd.to_numeric, como hace main.py por defecto.
+- esquema:  cargar_ventas() con ventas.ESQUEMA y FORMATO_FECHA.
+
+Sin -a genera un CSV de --filas filas con semilla fija en una carpeta temporal.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+DIRECTORIO_APP = Path(__file__).resolve().parent
+MODOS = ('inferido', 'esquema')
+
+
+def pico_rss_mb():
+    """Pico de memoria residente de este proceso en MB."""
+    # En Linux ru_maxrss sobrevive a fork+exec: el proceso hijo empezaría con el
+    # pico del padre (p. ej. tras generar el CSV). VmHWM es del proceso actual
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for linea in f:
+                if linea.startswith('VmHWM:'):
+                    return int(linea.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1 << 20) if sys.platform == 'darwin' else pico / 1024
+
+
+def cargar(ruta, modo, cola):
+    """Proceso hijo: carga ruta con el modo dado y devuelve tiempos y memoria."""
+    try:
+        sys.path.insert(0, str(DIRECTORIO_APP))
+        import pandas as pd
+        from ventas import cargar_ventas, leer_ventas
+        base = pico_rss_mb()
+
+        inicio = time.perf_counter()
+        if modo == 'esquema':
+            df = cargar_ventas(ruta)
+        else:
+            df = leer_ventas(ruta)
+            df['cantidad'] = pd.to_numeric(df['cantidad'])
+            df['precio'] = pd.to_numeric(df['precio'])
+        segundos = time.perf_counter() - inicio
+        cola.put({
+            'filas': len(df),
+            'cargar_s': round(segundos, 3),
+            'pico_mb': round(pico_rss_mb() - base, 1),
+        })
+    except Exception as e:
+        cola.put({'error': repr(e)})
+
+
+def generar(ruta, filas, semilla):
+    """Genera en ruta unas `filas` ventas de 2020 a 2024 con el generador del proyecto."""
+    import numpy as np
+    from generar_datos_ventas import PRECIOS_BASE, Parametros, escribir_archivo
+    desde, hasta = date(2020, 1, 1), date(2024, 12, 31)
+    por_dia = max(1, filas // ((hasta - desde) // timedelta(days=1) + 1))
+    parametros = Parametros(desde, hasta, por_dia, por_dia, PRECIOS_BASE, 5,
+                            np.random.SeedSequence(semilla).entropy, 1_000_000)
+    return escribir_archivo(parametros, ruta, os.cpu_count() or 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara la carga del CSV de ventas con y sin esquema de tipos.")
+    parser.add_argument("-a", "--archivo", help="CSV a cargar (por defecto se genera uno)")
+    parser.add_argument("--filas", type=int, default=10_000_000,
+                        help="Filas del CSV generado (por defecto: 10000000)")
+    parser.add_argument("--semilla", type=int, default=1, help="Semilla del CSV generado (por defecto: 1)")
+    parser.add_argument("-m", "--modos", nargs="+", choices=MODOS, default=list(MODOS),
+                        help="Modos a medir (por defecto: todos)")
+    parser.add_argument("-o", "--salida", help="Archivo JSON donde guardar los resultados")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(DIRECTORIO_APP))
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = args.archivo
+        if ruta is None:
+            ruta = os.path.join(carpeta, 'ventas.csv')
+            inicio = time.perf_counter()
+            filas = generar(ruta, args.filas, args.semilla)
+            print(f"📦 Generadas {filas} filas en {time.perf_counter() - inicio:.1f} s")
+
+        contexto = multiprocessing.get_context('spawn')
+        resultados = []
+        print(f"{'modo':<10} {'filas':>10} {'cargar s':>9} {'pico MB':>9}")
+        for modo in args.modos:
+            cola = contexto.Queue()
+            proceso = contexto.Process(target=cargar, args=(ruta, modo, cola))
+            proceso.start()
+            r = cola.get()
+            proceso.join()
+            resultados.append({'modo': modo, **r})
+            if 'error' in r:
+                print(f"{modo:<10} ❌ {r['error']}")
+                continue
+            print(f"{modo:<10} {r['filas']:>10} {r['cargar_s']:>9} {r['pico_mb']:>9}")
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+        print(f"\n✅ Resultados guardados en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
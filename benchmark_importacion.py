@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark de arranque de main.py y analisis.py con python -X importtime.
+
+Ejecuta cada variante en una carpeta temporal (con un ventas.csv pequeño y
+datos.csv) y mide el tiempo total, el tiempo de imports que informa
+-X importtime y si se llegaron a importar pandas y matplotlib. Las variantes
+con gráficos parten sin gráficos previos, así que siempre dibujan.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+DIRECTORIO_APP = Path(__file__).resolve().parent
+
+VARIANTES = {
+    'main': ['main.py'],
+    'main --no-graficos': ['main.py', '--no-graficos'],
+    'main --informe json': ['main.py', '--informe', 'json'],
+    'analisis': ['analisis.py'],
+    'analisis --informe json': ['analisis.py', '--informe', 'json'],
+}
+
+
+def medir(argumentos, carpeta):
+    """Ejecuta una variante y devuelve tiempos y módulos pesados importados."""
+    for basura in ('.graficos.json', 'ventas_por_mes.png', 'top5_productos.png', 'grafica_dispersion.png'):
+        if os.path.exists(os.path.join(carpeta, basura)):
+            os.remove(os.path.join(carpeta, basura))
+    script, *resto = argumentos
+    inicio = time.perf_counter()
+    proceso = subprocess.run([sys.executable, '-X', 'importtime', str(DIRECTORIO_APP / script), *resto],
+                             cwd=carpeta, capture_output=True, text=True, check=True)
+    total = time.perf_counter() - inicio
+    # Líneas "import time: <propio us> | <acumulado us> | <módulo>"
+    propio, modulos = 0, set()
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith('import time:') or 'self [us]' in linea:
+            continue
+        campos = linea[len('import time:'):].split('|')
+        propio += int(campos[0])
+        modulos.add(campos[2].strip().split('.')[0])
+    return {
+        'total_s': total,
+        'imports_s': propio / 1e6,
+        'pandas': 'pandas' in modulos,
+        'matplotlib': 'matplotlib' in modulos,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide el coste de imports de main.py y analisis.py.")
+    parser.add_argument("-r", "--repeticiones", type=int, default=3,
+                        help="Ejecuciones por variante; se muestra la mediana (por defecto: 3)")
+    parser.add_argument("-v", "--variantes", nargs="+", choices=list(VARIANTES), default=list(VARIANTES),
+                        help="Variantes a medir (por defecto: todas)")
+    parser.add_argument("-o", "--salida", help="Archivo JSON donde guardar los resultados")
+    args = parser.parse_args()
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as carpeta:
+        subprocess.run([sys.executable, str(DIRECTORIO_APP / 'generar_datos_ventas.py'), '--semilla', '1'],
+                       cwd=carpeta, capture_output=True, check=True)
+        shutil.copy(DIRECTORIO_APP / 'datos.csv', carpeta)
+
+        print(f"{'variante':<26} {'total s':>8} {'imports s':>10} {'pandas':>7} {'matplotlib':>11}")
+        for nombre in args.variantes:
+            medidas = [medir(VARIANTES[nombre], carpeta) for _ in range(args.repeticiones)]
+            r = {
+                'variante': nombre,
+                'total_s': round(statistics.median(m['total_s'] for m in medidas), 3),
+                'imports_s': round(statistics.median(m['imports_s'] for m in medidas), 3),
+                'pandas': medidas[0]['pandas'],
+                'matplotlib': medidas[0]['matplotlib'],
+            }
+            resultados.append(r)
+            print(f"{nombre:<26} {r['total_s']:>8} {r['imports_s']:>10} "
+                  f"{'sí' if r['pandas'] else 'no':>7} {'sí' if r['matplotlib'] else 'no':>11}")
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+        print(f"\n✅ Resultados guardados en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark del índice de tareas frente a la lista original.
+
+Mide el coste por petición de completar una tarea y de obtener las primeras
+tareas del listado con 1k..1M tareas. Con IndiceTareas el coste debe ser plano;
+con la lista (búsqueda lineal + sorted) crece con el número de tareas.
+"""
+
+import argparse
+import random
+import time
+from itertools import islice
+
+from indice_tareas import IndiceTareas
+
+TAMANO_PAGINA = 50
+
+
+def crear_tareas(n):
+    """Genera n tareas; una de cada cuatro ya completada."""
+    return [{'id': i, 'texto': f'Tarea {i}', 'hecho': i % 4 == 0} for i in range(1, n + 1)]
+
+
+def medir(funcion, argumentos):
+    """Ejecuta funcion con cada argumento y devuelve el tiempo medio en microsegundos."""
+    inicio = time.perf_counter()
+    for argumento in argumentos:
+        funcion(argumento)
+    return (time.perf_counter() - inicio) / len(argumentos) * 1e6
+
+
+def medir_indice(n, repeticiones):
+    indice = IndiceTareas(crear_tareas(n))
+    pendientes = [t['id'] for t in islice(indice, indice.num_pendientes)]
+    ids = random.sample(pendientes, min(repeticiones, len(pendientes)))
+    completar = medir(indice.completar, ids)
+    listar = medir(lambda _: list(islice(indice, TAMANO_PAGINA)), range(repeticiones))
+    return completar, listar
+
+
+def medir_lista(n, repeticiones):
+    """Reproduce el enfoque original: recorrer la lista para completar y ordenar para listar."""
+    tareas = crear_tareas(n)
+
+    def completar(id):
+        for tarea in tareas:
+            if tarea['id'] == id:
+                tarea['hecho'] = True
+                break
+
+    def listar(_):
+        return sorted(tareas, key=lambda t: t['hecho'])[:TAMANO_PAGINA]
+
+    ids = random.sample(range(1, n + 1), min(repeticiones, n))
+    return medir(completar, ids), medir(listar, range(repeticiones))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara IndiceTareas con la lista de tareas original.")
+    parser.add_argument(
+        "--tamanos",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000, 100_000, 1_000_000],
+        help="Números de tareas a probar (por defecto: 1k, 10k, 100k y 1M)"
+    )
+    parser.add_argument(
+        "--repeticiones",
+        type=int,
+        default=200,
+        help="Peticiones medidas por tamaño para el índice (por defecto: 200)"
+    )
+    parser.add_argument(
+        "--sin-lista",
+        action="store_true",
+        help="No medir la lista original (es lenta con millones de tareas)"
+    )
+    args = parser.parse_args()
+
+    random.seed(42)
+    print(f"{'tareas':>10} | {'completar (µs)':>15} {'listar (µs)':>12} | {'lista: completar':>17} {'lista: listar':>14}")
+    print("-" * 78)
+    for n in args.tamanos:
+        completar, listar = medir_indice(n, args.repeticiones)
+        linea = f"{n:>10} | {completar:>15.2f} {listar:>12.2f} |"
+        if not args.sin_lista:
+            # La lista original es O(n) por petición: basta con pocas repeticiones
+            completar_lista, listar_lista = medir_lista(n, max(3, args.repeticiones // 20))
+            linea += f" {completar_lista:>17.2f} {listar_lista:>14.2f}"
+        print(linea)
+
+
+if __name__ == "__main__":
+    main()
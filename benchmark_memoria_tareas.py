@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark de memoria de las representaciones de tareas.
+
+Compara la lista de diccionarios original, IndiceTareas (un diccionario por
+tarea más los grupos enlazados) e IndiceCompacto (columnas) con 100k y 1M
+tareas. Cada medida se hace en un proceso nuevo con tracemalloc: se informa de
+la memoria que queda ocupada, el pico durante la construcción y el tiempo de
+construir (inflado por tracemalloc, sirve solo para comparar) y de listar la
+primera página.
+"""
+
+import argparse
+import json
+import multiprocessing
+import time
+import tracemalloc
+from itertools import islice
+
+TAMANO_PAGINA = 50
+
+
+def generar_tareas(n):
+    """Tareas como en una instantánea: pendientes por id y luego las completadas (una de cada cuatro)."""
+    for i in range(1, n + 1):
+        if i % 4:
+            yield {'id': i, 'texto': f'Tarea de prueba {i}', 'hecho': False}
+    for i in range(4, n + 1, 4):
+        yield {'id': i, 'texto': f'Tarea de prueba {i}', 'hecho': True}
+
+
+def construir(estructura, n):
+    if estructura == 'lista':
+        return list(generar_tareas(n))
+    if estructura == 'indice':
+        from indice_tareas import IndiceTareas
+        return IndiceTareas(generar_tareas(n))
+    from indice_compacto import IndiceCompacto
+    return IndiceCompacto(generar_tareas(n))
+
+
+def medir(estructura, n, cola):
+    """Proceso hijo: construye la estructura bajo tracemalloc y devuelve las medidas."""
+    if estructura != 'lista':
+        # Se importa antes de medir para no contar el código del módulo
+        construir(estructura, 0)
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    tareas = construir(estructura, n)
+    construccion = time.perf_counter() - inicio
+    actual, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    inicio = time.perf_counter()
+    if estructura == 'lista':
+        pagina = sorted(tareas, key=lambda t: t['hecho'])[:TAMANO_PAGINA]
+    else:
+        pagina = list(islice(tareas, TAMANO_PAGINA))
+    listado = time.perf_counter() - inicio
+    assert len(pagina) == min(n, TAMANO_PAGINA)
+
+    cola.put({
+        'estructura': estructura,
+        'tareas': n,
+        'memoria_mb': round(actual / 2**20, 1),
+        'bytes_por_tarea': round(actual / n, 1),
+        'pico_mb': round(pico / 2**20, 1),
+        'construccion_s': round(construccion, 3),
+        'primera_pagina_ms': round(listado * 1000, 3),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara la memoria de las representaciones de tareas.")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[100_000, 1_000_000],
+                        help="Número de tareas (por defecto: 100k y 1M)")
+    parser.add_argument("-o", "--salida", help="Archivo JSON donde guardar los resultados")
+    args = parser.parse_args()
+
+    contexto = multiprocessing.get_context('spawn')
+    resultados = []
+    print(f"{'estructura':<10} {'tareas':>10} {'MB':>9} {'B/tarea':>9} {'pico MB':>9} {'construir s':>12} {'página ms':>10}")
+    for n in args.tamanos:
+        for estructura in ('lista', 'indice', 'compacto'):
+            cola = contexto.Queue()
+            proceso = contexto.Process(target=medir, args=(estructura, n, cola))
+            proceso.start()
+            r = cola.get()
+            proceso.join()
+            resultados.append(r)
+            print(f"{estructura:<10} {n:>10} {r['memoria_mb']:>9} {r['bytes_por_tarea']:>9} {r['pico_mb']:>9} "
+                  f"{r['construccion_s']:>12} {r['primera_pagina_ms']:>10}")
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+        print(f"\n✅ Resultados guardados en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
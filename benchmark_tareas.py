@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Benchmark de carga y latencia del gestor de tareas (app.py).
+
+Para cada tamaño (1k, 100k y 1M tareas por defecto) prepara un almacén con ese
+número de tareas en una carpeta temporal, arranca la app en un proceso nuevo y
+mide `/`, `/agregar` y `/completar/<id>` con el cliente de pruebas de Flask o,
+con --http, con varios hilos contra un servidor HTTP local. El informe (JSON)
+incluye rendimiento, latencias p50/p95/p99 y memoria máxima (RSS) por tamaño,
+para comparar ejecuciones entre almacenes y configuraciones de caché.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DIRECTORIO_APP = Path(__file__).resolve().parent
+
+
+def sembrar(n):
+    """Escribe tareas.json con n tareas (una de cada cuatro completada) en la carpeta actual."""
+    from almacenamiento import escribir_instantanea
+
+    tareas = [{'id': i, 'texto': f'Tarea de prueba {i}', 'hecho': i % 4 == 0} for i in range(1, n + 1)]
+    escribir_instantanea('tareas.json', tareas, n + 1)
+
+
+def rss_maximo_mb():
+    """Memoria residente máxima del proceso en MB (None si no se puede medir)."""
+    if resource is None:
+        return None
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KB y macOS en bytes
+    return round(maximo / 1024 if sys.platform != 'darwin' else maximo / (1024 * 1024), 1)
+
+
+def resumir(ruta, latencias, segundos):
+    """Calcula rendimiento y percentiles de una lista de latencias en segundos."""
+    latencias_ms = sorted(l * 1000 for l in latencias)
+    if len(latencias_ms) > 1:
+        percentiles = statistics.quantiles(latencias_ms, n=100, method='inclusive')
+        p50, p95, p99 = percentiles[49], percentiles[94], percentiles[98]
+    else:
+        p50 = p95 = p99 = latencias_ms[0]
+    return {
+        'ruta': ruta,
+        'peticiones': len(latencias_ms),
+        'segundos': round(segundos, 4),
+        'peticiones_por_segundo': round(len(latencias_ms) / segundos, 2) if segundos else None,
+        'p50_ms': round(p50, 3),
+        'p95_ms': round(p95, 3),
+        'p99_ms': round(p99, 3),
+    }
+
+
+class ClientePruebas:
+    """Lanza peticiones con el cliente de pruebas de Flask, una detrás de otra."""
+
+    def __init__(self, app):
+        self.cliente = app.test_client()
+
+    def medir(self, peticiones, max_segundos):
+        latencias = []
+        inicio = time.perf_counter()
+        for metodo, url, datos in peticiones:
+            t = time.perf_counter()
+            respuesta = self.cliente.open(url, method=metodo, data=datos)
+            latencias.append(time.perf_counter() - t)
+            if respuesta.status_code >= 400:
+                raise RuntimeError(f'{metodo} {url} devolvió {respuesta.status_code}')
+            if time.perf_counter() - inicio > max_segundos:
+                break
+        return latencias, time.perf_counter() - inicio
+
+
+class ClienteHTTP:
+    """Lanza peticiones reales desde varios hilos contra un servidor local con hilos."""
+
+    def __init__(self, app, hilos):
+        from werkzeug.serving import make_server
+
+        self.hilos = hilos
+        self.servidor = make_server('127.0.0.1', 0, app, threaded=True)
+        self.base = f'http://127.0.0.1:{self.servidor.server_port}'
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+
+    def _peticion(self, metodo, url, datos):
+        cuerpo = urllib.parse.urlencode(datos).encode() if datos else None
+        peticion = urllib.request.Request(self.base + url, data=cuerpo, method=metodo)
+        t = time.perf_counter()
+        # Las redirecciones no se siguen: se mide solo la petición pedida
+        with urllib.request.build_opener(SinRedirecciones).open(peticion) as respuesta:
+            respuesta.read()
+        return time.perf_counter() - t
+
+    def medir(self, peticiones, max_segundos):
+        inicio = time.perf_counter()
+        limite = inicio + max_segundos
+
+        def lanzar(peticion):
+            if time.perf_counter() > limite:
+                return None
+            return self._peticion(*peticion)
+
+        with ThreadPoolExecutor(self.hilos) as ejecutor:
+            latencias = [l for l in ejecutor.map(lanzar, peticiones) if l is not None]
+        return latencias, time.perf_counter() - inicio
+
+    def cerrar(self):
+        self.servidor.shutdown()
+
+
+class SinRedirecciones(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+    def http_error_302(self, peticion, fp, codigo, mensaje, cabeceras):
+        return fp
+
+
+def ejecutar_tamano(tamano, opciones, cola):
+    """Proceso hijo: prepara los datos, importa la app y mide cada ruta."""
+    try:
+        with tempfile.TemporaryDirectory() as carpeta:
+            os.chdir(carpeta)
+            sys.path.insert(0, str(DIRECTORIO_APP))
+            sembrar(tamano)
+            os.environ.update(opciones['entorno'])
+
+            inicio = time.perf_counter()
+            import app
+            # Con SQLite la primera carga importa tareas.json
+            arranque = time.perf_counter() - inicio
+
+            random.seed(opciones['semilla'])
+            n = opciones['peticiones']
+            pendientes = [i for i in range(1, tamano + 1) if i % 4 != 0]
+            escenarios = {
+                'GET /': [('GET', '/', None)] * n,
+                'GET /?after=<id>': [('GET', f'/?after={random.randint(1, tamano)}', None) for _ in range(n)],
+                'POST /agregar': [('POST', '/agregar', {'texto_tarea': f'Nueva {i}'}) for i in range(n)],
+                'GET /completar/<id>': [('GET', f'/completar/{id}', None)
+                                        for id in random.sample(pendientes, min(n, len(pendientes)))],
+            }
+
+            if opciones['http']:
+                cliente = ClienteHTTP(app.app, opciones['hilos'])
+            else:
+                cliente = ClientePruebas(app.app)
+            resultados = []
+            for ruta, peticiones in escenarios.items():
+                latencias, segundos = cliente.medir(peticiones, opciones['max_segundos'])
+                resultados.append(resumir(ruta, latencias, segundos))
+            if opciones['http']:
+                cliente.cerrar()
+            app.almacen.cerrar()
+            os.chdir(DIRECTORIO_APP)
+        cola.put({
+            'tareas': tamano,
+            'arranque_s': round(arranque, 4),
+            'rss_max_mb': rss_maximo_mb(),
+            'rutas': resultados,
+        })
+    except Exception as e:
+        cola.put({'tareas': tamano, 'error': repr(e)})
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark de carga y latencia del gestor de tareas.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Ejemplos:
+  python benchmark_tareas.py                                  # json, 1k/100k/1M
+  python benchmark_tareas.py -a sqlite --tamanos 1000 100000
+  python benchmark_tareas.py --http --hilos 16 -o sqlite.json -a sqlite
+        """
+    )
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[1_000, 100_000, 1_000_000],
+                        help="Número de tareas iniciales (por defecto: 1k, 100k y 1M)")
+    parser.add_argument("-a", "--almacenamiento", default="json",
+                        help="Almacén a medir: json, diario o sqlite (por defecto: json)")
+    parser.add_argument("-n", "--peticiones", type=int, default=200,
+                        help="Peticiones por ruta (por defecto: 200)")
+    parser.add_argument("--max-segundos", type=float, default=30.0,
+                        help="Tiempo máximo por ruta; corta antes con almacenes lentos (por defecto: 30)")
+    parser.add_argument("--http", action="store_true",
+                        help="Usar un servidor HTTP local y varios hilos en vez del cliente de pruebas")
+    parser.add_argument("--hilos", type=int, default=8, help="Hilos cliente con --http (por defecto: 8)")
+    parser.add_argument("-e", "--entorno", action="append", default=[], metavar="CLAVE=VALOR",
+                        help="Variables TAREAS_* extra, p. ej. -e TAREAS_STREAMING=true")
+    parser.add_argument("--semilla", type=int, default=42, help="Semilla aleatoria (por defecto: 42)")
+    parser.add_argument("-o", "--salida", help="Archivo JSON donde guardar el informe")
+    args = parser.parse_args()
+
+    entorno = {'TAREAS_ALMACENAMIENTO': args.almacenamiento}
+    entorno.update(par.split('=', 1) for par in args.entorno)
+    opciones = {
+        'entorno': entorno,
+        'peticiones': args.peticiones,
+        'max_segundos': args.max_segundos,
+        'http': args.http,
+        'hilos': args.hilos,
+        'semilla': args.semilla,
+    }
+
+    contexto = multiprocessing.get_context('spawn')
+    informe = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'modo': f'http ({args.hilos} hilos)' if args.http else 'cliente de pruebas',
+        'entorno': entorno,
+        'resultados': [],
+    }
+    for tamano in args.tamanos:
+        # Un proceso por tamaño: estado y memoria máxima independientes
+        cola = contexto.Queue()
+        proceso = contexto.Process(target=ejecutar_tamano, args=(tamano, opciones, cola))
+        proceso.start()
+        resultado = cola.get()
+        proceso.join()
+        informe['resultados'].append(resultado)
+
+        print(f"\n📊 {tamano} tareas ({args.almacenamiento})")
+        if 'error' in resultado:
+            print(f"   ❌ {resultado['error']}")
+            continue
+        print(f"   arranque: {resultado['arranque_s']:.3f} s   RSS máx.: {resultado['rss_max_mb']} MB")
+        print(f"   {'ruta':<22} {'pet.':>6} {'pet/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for r in resultado['rutas']:
+            print(f"   {r['ruta']:<22} {r['peticiones']:>6} {r['peticiones_por_segundo']:>10} "
+                  f"{r['p50_ms']:>9} {r['p95_ms']:>9} {r['p99_ms']:>9}")
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(informe, f, ensure_ascii=False, indent=2)
+        print(f"\n✅ Informe guardado en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Benchmark del análisis de ventas (main.py) por etapas y tamaños de datos.
+
+Para cada tamaño genera un CSV con semilla fija (el mismo en cada ejecución) y,
+en un proceso nuevo, mide por separado las funciones que usa main.py:
+
+- carga:         ventas.leer_ventas().
+- preparacion:   ventas.preparar(): columnas mes e ingreso.
+- por_mes:       ventas.agrupar_por_mes(): el groupby de ingresos por mes.
+- por_producto:  ventas.agrupar_por_producto(): cantidad e ingreso por producto.
+- graficos:      los dos gráficos del informe con ventas_graficos.dibujar() (sin caché de gráficos).
+
+Cada etapa se ejecuta una vez con tracemalloc para medir el pico de memoria
+que asigna y después --repeticiones veces sin él para cronometrarla; se guardan
+la mediana y el mínimo, y del proceso el pico de memoria residente. matplotlib
+se importa antes de medir. Cada ejecución se añade a un historial JSON. Con
+--base se compara el mínimo de cada etapa con el de una ejecución anterior y el
+programa termina con código 1 si alguna es más lenta que el umbral y, además,
+la diferencia supera --ruido-ms (para no fallar por el ruido de etapas cortas).
+
+    python benchmark_ventas.py                          # 10k, 1M y 10M filas
+    python benchmark_ventas.py --guardar-base base.json
+    python benchmark_ventas.py --base base.json --umbral 0.25
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+DIRECTORIO_APP = Path(__file__).resolve().parent
+ETAPAS = ('carga', 'preparacion', 'por_mes', 'por_producto', 'graficos')
+HISTORIAL = 'benchmark_ventas_historial.json'
+
+
+def medir_etapas(ruta, carpeta_graficos, repeticiones, cola):
+    """Proceso hijo: ejecuta las etapas sobre ruta y devuelve {etapa: {s, s_min, repeticiones, pico_mb}}."""
+    try:
+        sys.path.insert(0, str(DIRECTORIO_APP))
+        from benchmark_carga_ventas import pico_rss_mb
+        from ventas import Agregados, agrupar_por_mes, agrupar_por_producto, informe, leer_ventas, preparar
+        from ventas_graficos import dibujar, grafico_meses, grafico_top
+        import matplotlib.pyplot  # noqa: F401
+
+        resultado = {}
+
+        def etapa(nombre, funcion):
+            # La ejecución con tracemalloc (que la ralentiza) solo cuenta para la memoria
+            tracemalloc.start()
+            valor = funcion()
+            pico = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            tiempos = []
+            for _ in range(repeticiones):
+                valor = None  # que no convivan dos resultados en memoria
+                inicio = time.perf_counter()
+                valor = funcion()
+                tiempos.append(time.perf_counter() - inicio)
+            resultado[nombre] = {
+                's': round(statistics.median(tiempos), 4),
+                's_min': round(min(tiempos), 4),
+                'repeticiones': repeticiones,
+                'pico_mb': round(pico / (1 << 20), 1),
+            }
+            return valor
+
+        def cargar():
+            return leer_ventas(ruta)
+
+
+        def graficos():
+            dibujar(grafico_meses(analisis.ventas_por_mes, os.path.join(carpeta_graficos, 'ventas_por_mes.png')))
+            dibujar(grafico_top(analisis.ventas_prod, os.path.join(carpeta_graficos, 'top5_productos.png')))
+
+        # Mismo camino que ventas.analizar() sin bloques, con cada paso de agregar() por separado
+        df = etapa('carga', cargar)
+        tipos, primeras = df.dtypes, df.head()
+        etapa('preparacion', lambda: preparar(df))
+        por_mes = etapa('por_mes', lambda: agrupar_por_mes(df))
+        por_producto = etapa('por_producto', lambda: agrupar_por_producto(df))
+        analisis = informe(Agregados(por_mes, por_producto, len(df)), tipos, primeras)
+        etapa('graficos', graficos)
+
+        # VmHWM: ru_maxrss arrastraría el pico del padre, que acaba de generar el CSV
+        resultado['rss_pico_mb'] = round(pico_rss_mb(), 1)
+        resultado['filas'] = len(df)
+        cola.put(resultado)
+    except Exception as e:
+        cola.put({'error': repr(e)})
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=DIRECTORIO_APP,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def ejecutar(tamanos, semilla, carpeta_datos, repeticiones):
+    """Una ejecución completa: {'fecha', 'commit', ..., 'resultados': {tamaño: etapas}}."""
+    from benchmark_carga_ventas import generar
+    contexto = multiprocessing.get_context('spawn')
+    resultados = {}
+    for n in tamanos:
+        ruta = os.path.join(carpeta_datos, f'ventas_{n}_{semilla}.csv')
+        if not os.path.exists(ruta):
+            generar(ruta, n, semilla)
+        with tempfile.TemporaryDirectory() as carpeta_graficos:
+            cola = contexto.Queue()
+            proceso = contexto.Process(target=medir_etapas, args=(ruta, carpeta_graficos, repeticiones, cola))
+            proceso.start()
+            r = cola.get()
+            proceso.join()
+        resultados[str(n)] = r
+        if 'error' in r:
+            print(f"{n:>10} ❌ {r['error']}")
+            continue
+        etapas = ' '.join(f"{r[e]['s']:>14.3f} {r[e]['pico_mb']:>7}" for e in ETAPAS)
+        print(f"{r['filas']:>10} {etapas} {r['rss_pico_mb']:>9}")
+    return {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'maquina': platform.machine(),
+        'semilla': semilla,
+        'repeticiones': repeticiones,
+        'resultados': resultados,
+    }
+
+
+def _minimo(etapa):
+    # Las ejecuciones antiguas solo tienen 's', de una única medida
+    return etapa.get('s_min', etapa['s'])
+
+
+def comparar(actual, base, umbral, ruido_ms=50):
+    """
+    Lista de regresiones (texto) de actual frente a base: etapas cuyo mínimo es
+    más lento que el de base × (1 + umbral) por más de ruido_ms milisegundos.
+    """
+    regresiones = []
+    print(f"\n📊 Comparación de mínimos con la base ({base.get('fecha')}, commit {base.get('commit')}):")
+    for n, etapas in actual['resultados'].items():
+        anteriores = base['resultados'].get(n)
+        if not anteriores or 'error' in etapas or 'error' in anteriores:
+            continue
+        for e in ETAPAS:
+            if e not in anteriores:
+                continue  # base de una versión con otras etapas
+            antes, ahora = _minimo(anteriores[e]), _minimo(etapas[e])
+            cambio = (ahora - antes) / antes if antes else 0.0
+            regresion = cambio > umbral and (ahora - antes) * 1000 > ruido_ms
+            marca = '❌' if regresion else '✅'
+            print(f"  {marca} {n:>10} {e:<12} {antes:>9.3f} s → {ahora:>9.3f} s ({cambio:+.0%})")
+            if regresion:
+                regresiones.append(f"{n} filas, {e}: {antes:.3f} s → {ahora:.3f} s ({cambio:+.0%})")
+    return regresiones
+
+
+def _leer_json(ruta, defecto):
+    try:
+        with open(ruta, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return defecto
+
+
+def _escribir_json(ruta, datos):
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, ensure_ascii=False, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark por etapas del análisis de ventas.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Ejemplos:
+  python benchmark_ventas.py                                # 10k, 1M y 10M filas
+  python benchmark_ventas.py --tamanos 10000 1000000 --guardar-base base.json
+  python benchmark_ventas.py --base base.json --umbral 0.2  # código 1 si alguna etapa va >20% más lenta
+  python benchmark_ventas.py --base base.json -r 10 --ruido-ms 100
+  python benchmark_ventas.py --carpeta-datos /tmp/ventas    # reutilizar los CSV generados
+        """
+    )
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000],
+                        help="Filas de cada CSV (por defecto: 10k, 1M y 10M)")
+    parser.add_argument("-r", "--repeticiones", type=int, default=5,
+                        help="Ejecuciones cronometradas de cada etapa (por defecto: 5)")
+    parser.add_argument("--semilla", type=int, default=1, help="Semilla de los datos (por defecto: 1)")
+    parser.add_argument("--carpeta-datos", help="Carpeta donde generar (y reutilizar) los CSV; por defecto, una temporal")
+    parser.add_argument("--historial", default=HISTORIAL,
+                        help=f"JSON al que se añade cada ejecución (por defecto: {HISTORIAL})")
+    parser.add_argument("--base", help="JSON con la ejecución de referencia (o un historial: se usa la última)")
+    parser.add_argument("--guardar-base", metavar="RUTA", help="Guardar esta ejecución como referencia")
+    parser.add_argument("--umbral", type=float, default=0.2,
+                        help="Aumento de tiempo tolerado frente a la base (por defecto: 0.2 = 20%%)")
+    parser.add_argument("--ruido-ms", type=float, default=50,
+                        help="Diferencias menores que esto no cuentan como regresión (por defecto: 50 ms)")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(DIRECTORIO_APP))
+    cabecera = ' '.join(f"{e + ' s':>14} {'MB':>7}" for e in ETAPAS)
+    print(f"{'filas':>10} {cabecera} {'RSS MB':>9}")
+    if args.carpeta_datos:
+        os.makedirs(args.carpeta_datos, exist_ok=True)
+        actual = ejecutar(args.tamanos, args.semilla, args.carpeta_datos, args.repeticiones)
+    else:
+        with tempfile.TemporaryDirectory() as carpeta:
+            actual = ejecutar(args.tamanos, args.semilla, carpeta, args.repeticiones)
+
+    base = None
+    if args.base:
+        base = _leer_json(args.base, None)
+        if base is None:
+            parser.error(f"no existe {args.base}")
+        if isinstance(base, list):
+            base = base[-1]
+
+    historial = _leer_json(args.historial, [])
+    historial.append(actual)
+    _escribir_json(args.historial, historial)
+    print(f"\n✅ Ejecución añadida a {args.historial} ({len(historial)} en total)")
+    if args.guardar_base:
+        _escribir_json(args.guardar_base, actual)
+        print(f"✅ Base guardada en {args.guardar_base}")
+
+    if base is not None:
+        regresiones = comparar(actual, base, args.umbral, args.ruido_ms)
+        if regresiones:
+            print(f"\n❌ {len(regresiones)} regresión(es) por encima del {args.umbral:.0%}:")
+            for r in regresiones:
+                print(f"  - {r}")
+            sys.exit(1)
+        print(f"\n✅ Sin regresiones por encima del {args.umbral:.0%}")
+
+
+if __name__ == "__main__":
+    main()
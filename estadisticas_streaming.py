@@ -0,0 +1,229 @@
+"""
+Estadísticas de todas las columnas numéricas de un CSV en una sola pasada.
+
+El archivo se lee por bloques (leer_en_bloques) y cada columna lleva un
+EstadoColumna: cuenta, media y suma de cuadrados de desviaciones (Welford, con
+la fórmula de Chan para sumar un bloque entero de una vez), mínimo y máximo
+exactos, y un TDigest para la mediana y los cuantiles aproximados. Los estados
+se pueden combinar, así que varios procesos pueden resumir rangos de bytes
+distintos del archivo (ventas_paralelo.rangos_de_bytes) y juntar el resultado.
+La memoria depende del tamaño de bloque, no del archivo.
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from ventas_paralelo import LectorRango, rangos_de_bytes
+
+# Con 1000 cada centroide del centro cubre ~0.3% de los datos (~500 centroides en total)
+COMPRESION = 1000
+
+
+def leer_en_bloques(origen, filas_por_bloque=1_000_000, **opciones):
+    """DataFrames de filas_por_bloque filas de un CSV (ruta o archivo abierto)."""
+    return pd.read_csv(origen, chunksize=filas_por_bloque, **opciones)
+
+
+class TDigest:
+    """
+    Resumen de una distribución con centroides (media, peso) ordenados, más
+    pequeños en las colas (escala k1 de Dunning). Se construye y se combina
+    con operaciones de NumPy: los puntos se ordenan, se agrupan por el
+    intervalo entero de k en el que cae su cuantil y cada grupo es un centroide.
+    Cada centroide recuerda su mínimo y su máximo: si son iguales (valores
+    repetidos, típico en columnas enteras) los cuantiles que caen dentro son exactos.
+    """
+
+    def __init__(self, compresion=COMPRESION):
+        self.compresion = compresion
+        self.medias = np.empty(0)
+        self.pesos = np.empty(0)
+        self.minimos = np.empty(0)
+        self.maximos = np.empty(0)
+        self.minimo = math.inf
+        self.maximo = -math.inf
+
+    @property
+    def total(self):
+        return float(self.pesos.sum())
+
+    def agregar(self, valores):
+        valores = np.asarray(valores, dtype=np.float64)
+        if len(valores):
+            self.minimo = min(self.minimo, float(valores.min()))
+            self.maximo = max(self.maximo, float(valores.max()))
+            self._comprimir(np.concatenate([self.medias, valores]),
+                            np.concatenate([self.pesos, np.ones(len(valores))]),
+                            np.concatenate([self.minimos, valores]),
+                            np.concatenate([self.maximos, valores]))
+
+    def combinar(self, otro):
+        if len(otro.medias):
+            self.minimo = min(self.minimo, otro.minimo)
+            self.maximo = max(self.maximo, otro.maximo)
+            self._comprimir(np.concatenate([self.medias, otro.medias]),
+                            np.concatenate([self.pesos, otro.pesos]),
+                            np.concatenate([self.minimos, otro.minimos]),
+                            np.concatenate([self.maximos, otro.maximos]))
+        return self
+
+    def _comprimir(self, medias, pesos, minimos, maximos):
+        orden = np.argsort(medias, kind='stable')
+        medias, pesos = medias[orden], pesos[orden]
+        acumulado = np.cumsum(pesos)
+        q = (acumulado - pesos / 2) / acumulado[-1]
+        k = self.compresion / (2 * math.pi) * np.arcsin(2 * q - 1)
+        grupo = np.floor(k)
+        inicios = np.flatnonzero(np.r_[True, grupo[1:] != grupo[:-1]])
+        self.pesos = np.add.reduceat(pesos, inicios)
+        self.medias = np.add.reduceat(medias * pesos, inicios) / self.pesos
+        self.minimos = np.minimum.reduceat(minimos[orden], inicios)
+        self.maximos = np.maximum.reduceat(maximos[orden], inicios)
+
+    def cuantil(self, q):
+        """Valor aproximado del cuantil q (0-1; admite un array). Exacto con pocos datos."""
+        if not len(self.medias):
+            return math.nan
+        acumulado = np.cumsum(self.pesos)
+        total = acumulado[-1]
+        centros = (acumulado - self.pesos / 2) / total
+        valor = np.interp(q, np.r_[0.0, centros, 1.0], np.r_[self.minimo, self.medias, self.maximo])
+        # Dentro (no en el borde) de un centroide de valores iguales, ese valor
+        posicion = np.asarray(q, dtype=np.float64) * total
+        i = np.minimum(np.searchsorted(acumulado, posicion), len(acumulado) - 1)
+        dentro = (acumulado[i] - self.pesos[i] < posicion) & (posicion < acumulado[i])
+        puro = dentro & (self.minimos[i] == self.maximos[i])
+        return np.where(puro, self.minimos[i], valor)
+
+
+class EstadoColumna:
+    """Estadísticas combinables de una columna numérica (se ignoran los NaN)."""
+
+    def __init__(self, compresion=COMPRESION):
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0  # suma de cuadrados de las desviaciones a la media
+        self.digest = TDigest(compresion)
+
+    def agregar(self, valores):
+        valores = np.asarray(valores, dtype=np.float64)
+        valores = valores[~np.isnan(valores)]
+        if not len(valores):
+            return
+        media = float(valores.mean())
+        self._sumar(len(valores), media, float(np.square(valores - media).sum()))
+        self.digest.agregar(valores)
+
+    def combinar(self, otro):
+        self._sumar(otro.n, otro.media, otro.m2)
+        self.digest.combinar(otro.digest)
+        return self
+
+    def _sumar(self, n, media, m2):
+        # Chan et al.: media y m2 de la unión a partir de las de cada parte
+        if not n:
+            return
+        total = self.n + n
+        delta = media - self.media
+        self.media += delta * n / total
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.n = total
+
+    @property
+    def minimo(self):
+        return self.digest.minimo if self.n else math.nan
+
+    @property
+    def maximo(self):
+        return self.digest.maximo if self.n else math.nan
+
+    @property
+    def varianza(self):
+        """Varianza muestral (n - 1), como pandas."""
+        return self.m2 / (self.n - 1) if self.n > 1 else math.nan
+
+    @property
+    def desviacion(self):
+        return math.sqrt(self.varianza)
+
+    @property
+    def mediana(self):
+        return float(self.digest.cuantil(0.5))
+
+    def cuantil(self, q):
+        return self.digest.cuantil(q)
+
+    def resumen(self, cuantiles=(0.25, 0.5, 0.75)):
+        """Diccionario serializable con todas las estadísticas."""
+        return {
+            'n': self.n,
+            'media': self.media if self.n else math.nan,
+            'mediana': self.mediana,
+            'desviacion': self.desviacion,
+            'varianza': self.varianza,
+            'minimo': self.minimo,
+            'maximo': self.maximo,
+            'cuantiles': {str(q): float(self.cuantil(q)) for q in cuantiles},
+        }
+
+
+def resumir(bloques, compresion=COMPRESION):
+    """
+    Recorre los bloques una vez y devuelve ({columna: EstadoColumna}, primeras filas).
+
+    Las columnas son las numéricas del primer bloque; en los siguientes se
+    convierten a número (lo que no lo sea cuenta como NaN).
+    """
+    estados = primeras = None
+    for df in bloques:
+        if estados is None:
+            primeras = df.head()
+            estados = {c: EstadoColumna(compresion) for c in df.select_dtypes('number').columns}
+        for columna, estado in estados.items():
+            estado.agregar(pd.to_numeric(df[columna], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan))
+    return estados or {}, primeras
+
+
+def combinar(parciales):
+    """Combina en orden varios {columna: EstadoColumna}."""
+    total = None
+    for parcial in parciales:
+        if total is None:
+            total = parcial
+            continue
+        for columna, estado in parcial.items():
+            if columna in total:
+                total[columna].combinar(estado)
+            else:
+                total[columna] = estado
+    return total or {}
+
+
+def _resumir_rango(ruta, nombres, inicio, fin, filas_por_bloque, compresion):
+    """Proceso de trabajo: estados del rango de bytes [inicio, fin)."""
+    with LectorRango(ruta, inicio, fin) as lector:
+        return resumir(leer_en_bloques(lector, filas_por_bloque, header=None, names=nombres), compresion)
+
+
+def resumir_archivo(ruta, filas_por_bloque=1_000_000, procesos=1, compresion=COMPRESION):
+    """
+    ({columna: EstadoColumna}, primeras filas) de un CSV, en un proceso o
+    repartiendo rangos de bytes entre varios (procesos=None: uno por núcleo).
+    """
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1:
+        return resumir(leer_en_bloques(ruta, filas_por_bloque), compresion)
+    nombres, rangos = rangos_de_bytes(ruta, procesos)
+    argumentos = [(ruta, nombres, a, b, filas_por_bloque, compresion) for a, b in rangos]
+    with ProcessPoolExecutor(min(procesos, max(1, len(rangos)))) as ejecutor:
+        resultados = list(ejecutor.map(_resumir_rango, *zip(*argumentos)))
+    if not resultados:
+        return {}, None
+    # Cada rango decide sus columnas numéricas; mandan las del primero
+    columnas = list(resultados[0][0])
+    total = combinar({c: e for c, e in parcial.items() if c in columnas} for parcial, _ in resultados)
+    return total, resultados[0][1]
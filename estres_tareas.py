@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Prueba de estrés del gestor de tareas: muchos procesos y muchos hilos creando y
+completando tareas a la vez sobre el mismo almacén.
+
+Al terminar comprueba que no hay ids repetidos ni perdidos, que todas las
+tareas completadas figuran como hechas y que el archivo de datos se puede leer.
+Devuelve código de salida 1 si algo falla.
+"""
+
+import argparse
+import multiprocessing
+import os
+import queue
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+DIRECTORIO_APP = Path(__file__).resolve().parent
+TIEMPO_MAXIMO = 600  # segundos de espera por proceso
+
+
+def trabajador(carpeta, entorno, hilos, operaciones, cola):
+    """Proceso hijo: importa la app en la carpeta de datos y la ataca con varios hilos."""
+    os.chdir(carpeta)
+    os.environ.update(entorno)
+    sys.path.insert(0, str(DIRECTORIO_APP))
+    import app
+
+    creadas, completadas, errores = [], [], []
+
+    def hilo():
+        cliente = app.app.test_client()
+        try:
+            for i in range(operaciones):
+                respuesta = cliente.post('/api/tareas', json={'agregar': [f'{os.getpid()}-{i}']})
+                id = respuesta.get_json()['creadas'][0]
+                creadas.append(id)
+                # Se completa una de cada tres tareas recién creadas
+                if i % 3 == 0:
+                    respuesta = cliente.post('/api/tareas', json={'completar': [id]})
+                    completadas.extend(respuesta.get_json()['completadas'])
+        except Exception as e:
+            errores.append(repr(e))
+
+    hilos_activos = [threading.Thread(target=hilo) for _ in range(hilos)]
+    for h in hilos_activos:
+        h.start()
+    for h in hilos_activos:
+        h.join()
+    try:
+        app.almacen.cerrar()
+    except Exception as e:
+        errores.append(f'al cerrar: {e!r}')
+    cola.put((creadas, completadas, errores))
+
+
+def estresar(almacenamiento, procesos, hilos, operaciones, extra_entorno=None):
+    """Lanza la prueba con un tipo de almacenamiento y devuelve la lista de problemas encontrados."""
+    from almacenamiento import crear_almacen
+
+    problemas = []
+    with tempfile.TemporaryDirectory() as carpeta:
+        entorno = {'TAREAS_ALMACENAMIENTO': almacenamiento, 'TAREAS_UMBRAL_DIARIO': '4096'}
+        entorno.update(extra_entorno or {})
+        contexto = multiprocessing.get_context('spawn')
+        cola = contexto.Queue()
+        hijos = [
+            contexto.Process(target=trabajador, args=(carpeta, entorno, hilos, operaciones, cola))
+            for _ in range(procesos)
+        ]
+        for hijo in hijos:
+            hijo.start()
+        resultados = []
+        for _ in hijos:
+            try:
+                resultados.append(cola.get(timeout=TIEMPO_MAXIMO))
+            except queue.Empty:
+                problemas.append('algún proceso terminó sin devolver resultados')
+                break
+        for hijo in hijos:
+            hijo.join()
+
+        creadas = [id for r in resultados for id in r[0]]
+        completadas = {id for r in resultados for id in r[1]}
+        problemas += [error for r in resultados for error in r[2]]
+        esperadas = procesos * hilos * operaciones
+        if len(set(creadas)) != len(creadas):
+            problemas.append(f'ids repetidos: {len(creadas) - len(set(creadas))}')
+        if len(creadas) != esperadas:
+            problemas.append(f'se crearon {len(creadas)} tareas de {esperadas}')
+
+        # Se vuelve a cargar desde disco como lo haría un proceso nuevo
+        os.chdir(carpeta)
+        config = {
+            'ALMACENAMIENTO': almacenamiento,
+            'ARCHIVO_DATOS': 'tareas.json',
+            'ARCHIVO_SQLITE': 'tareas.db',
+            'UMBRAL_DIARIO': 4096,
+            'ESCRITURA_DIFERIDA_MS': 0,
+            'ESCRITURA_DIFERIDA_MAX': 1000,
+            'INSTANTANEA_BINARIA': entorno.get('TAREAS_INSTANTANEA_BINARIA') == 'true',
+        }
+        try:
+            almacen = crear_almacen(config)
+            almacen.cargar()
+            tareas = list(almacen.listar())
+            almacen.cerrar()
+        except Exception as e:
+            problemas.append(f'no se pudo releer el almacén: {e!r}')
+            tareas = []
+        finally:
+            os.chdir(DIRECTORIO_APP)
+
+        ids = [t['id'] for t in tareas]
+        if sorted(ids) != sorted(creadas):
+            problemas.append(f'en disco hay {len(ids)} tareas, se crearon {len(creadas)}')
+        hechas = {t['id'] for t in tareas if t['hecho']}
+        if hechas != completadas:
+            problemas.append(f'completadas en disco: {len(hechas)}, esperadas: {len(completadas)}')
+    return problemas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de estrés concurrente del gestor de tareas.")
+    parser.add_argument("-p", "--procesos", type=int, default=4, help="Procesos (por defecto: 4)")
+    parser.add_argument("-t", "--hilos", type=int, default=8, help="Hilos por proceso (por defecto: 8)")
+    parser.add_argument("-n", "--operaciones", type=int, default=50, help="Tareas por hilo (por defecto: 50)")
+    parser.add_argument(
+        "-a", "--almacenamiento",
+        nargs="+",
+        default=["json", "diario", "sqlite"],
+        help="Almacenes a probar (por defecto: json diario sqlite)"
+    )
+    parser.add_argument("--binaria", action="store_true",
+                        help="Usar la instantánea binaria (TAREAS_INSTANTANEA_BINARIA) en json y diario")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(DIRECTORIO_APP))
+    extra_entorno = {'TAREAS_INSTANTANEA_BINARIA': 'true'} if args.binaria else {}
+    fallos = 0
+    for almacenamiento in args.almacenamiento:
+        problemas = estresar(almacenamiento, args.procesos, args.hilos, args.operaciones, extra_entorno)
+        estado = "✅" if not problemas else "❌"
+        print(f"{estado} {almacenamiento}: {args.procesos} procesos × {args.hilos} hilos × {args.operaciones} tareas")
+        for problema in problemas:
+            print(f"   - {problema}")
+        fallos += bool(problemas)
+
+    # La escritura diferida es de un solo proceso: se prueba solo con hilos
+    problemas = estresar('json', 1, args.hilos, args.operaciones, {**extra_entorno, 'TAREAS_ESCRITURA_DIFERIDA_MS': '20'})
+    estado = "✅" if not problemas else "❌"
+    print(f"{estado} json con escritura diferida: 1 proceso × {args.hilos} hilos × {args.operaciones} tareas")
+    for problema in problemas:
+        print(f"   - {problema}")
+    fallos += bool(problemas)
+
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,213 @@
-import pandas as pd
-import random
-from datetime import datetime, timedelta
-
-# Generar datos sintéticos de ventas
-productos = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H']
-precios_base = {'A': 10.0, 'B': 20.0, 'C': 15.0, 'D': 25.0, 'E': 30.0, 'F': 12.0, 'G': 18.0, 'H': 22.0}
-
-# Generar fechas desde enero 2025 hasta marzo 2025
-fecha_inicio = datetime(2025, 1, 1)
-fecha_fin = datetime(2025, 3, 31)
-
-ventas = []
-fecha_actual = fecha_inicio
-
-while fecha_actual <= fecha_fin:
-    # Generar entre 2 y 8 ventas por día
-    num_ventas_dia = random.randint(2, 8)
-    
-    for _ in range(num_ventas_dia):
-        producto = random.choice(productos)
-        cantidad = random.randint(1, 5)
-        precio = precios_base[producto]
-        
-        ventas.append({
-            'fecha': fecha_actual.strftime('%Y-%m-%d'),
-            'producto': producto,
-            'cantidad': cantidad,
-            'precio': precio
-        })
-    
-    fecha_actual += timedelta(days=1)
-
-# Crear DataFrame y guardar
-df = pd.DataFrame(ventas)
-df.to_csv('ventas.csv', index=False)
-
-print(f"✅ Datos generados: {len(df)} ventas")
-print(f"📅 Rango de fechas: {df['fecha'].min()} a {df['fecha'].max()}")
-print(f"📦 Productos: {df['producto'].unique()}")
-print("\nPrimeras 5 filas:")
-print(df.head())
+#!/usr/bin/env python3
+"""
+Genera datos sintéticos de ventas (fecha, producto, cantidad, precio) en CSV.
+
+Las filas se generan con NumPy por bloques de días y se escriben bloque a bloque,
+así la memoria no depende del tamaño del archivo. Cada día tiene su propia
+semilla derivada de --semilla, de modo que el resultado es el mismo con uno o
+con varios procesos y con cualquier tamaño de bloque.
+"""
+
+import argparse
+import csv
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import numpy as np
+
+# Catálogo por defecto
+PRECIOS_BASE = {'A': 10.0, 'B': 20.0, 'C': 15.0, 'D': 25.0, 'E': 30.0, 'F': 12.0, 'G': 18.0, 'H': 22.0}
+CABECERA = b'fecha,producto,cantidad,precio\n'
+
+
+def leer_catalogo(ruta):
+    """Lee un CSV con columnas producto,precio y devuelve {producto: precio}."""
+    with open(ruta, newline='', encoding='utf-8') as f:
+        return {fila['producto']: float(fila['precio']) for fila in csv.DictReader(f)}
+
+
+def catalogo_sintetico(n, entropia):
+    """n productos (P0001, P0002...) con precios entre 5 y 100 fijados por la semilla."""
+    rng = np.random.default_rng(np.random.SeedSequence(entropia, spawn_key=(1, 0)))
+    precios = np.round(rng.uniform(5, 100, n), 2)
+    return {f'P{i + 1:0{max(4, len(str(n)))}d}': float(p) for i, p in enumerate(precios)}
+
+
+class Parametros:
+    """Todo lo que necesita un proceso para generar cualquier bloque de días."""
+
+    def __init__(self, desde, hasta, filas_min, filas_max, catalogo, cantidad_max, entropia, filas_por_bloque):
+        self.desde = np.datetime64(desde, 'D')
+        self.num_dias = int((np.datetime64(hasta, 'D') - self.desde).astype(int)) + 1
+        self.filas_min = filas_min
+        self.filas_max = filas_max
+        self.productos = list(catalogo)
+        self.precios = list(catalogo.values())
+        self.cantidad_max = cantidad_max
+        self.entropia = entropia
+        # Días por bloque para que cada bloque tenga unas filas_por_bloque filas
+        media = (filas_min + filas_max) / 2
+        self.dias_por_bloque = max(1, int(filas_por_bloque // max(media, 1)))
+
+    @property
+    def num_bloques(self):
+        return -(-self.num_dias // self.dias_por_bloque)
+
+
+def generar_bloque(parametros, i):
+    """Devuelve las líneas CSV (bytes) del bloque de días i."""
+    p = parametros
+    primer_dia = i * p.dias_por_bloque
+    num_dias = min(p.dias_por_bloque, p.num_dias - primer_dia)
+
+    # Un generador por día: los datos no dependen del tamaño de bloque ni de los procesos
+    filas_por_dia, productos, cantidades = [], [], []
+    for d in range(primer_dia, primer_dia + num_dias):
+        rng = np.random.default_rng(np.random.SeedSequence(p.entropia, spawn_key=(0, d)))
+        k = int(rng.integers(p.filas_min, p.filas_max + 1))
+        filas_por_dia.append(k)
+        productos.append(rng.integers(0, len(p.productos), size=k))
+        cantidades.append(rng.integers(1, p.cantidad_max + 1, size=k))
+    producto = np.concatenate(productos)
+    cantidad = np.concatenate(cantidades)
+    n = len(producto)
+    dia = np.repeat(np.arange(num_dias), filas_por_dia)
+
+    # Cada línea es "<fecha>," + "<producto>,<cantidad>,<precio>\n"; las dos partes
+    # salen de tablas pequeñas y se unen en C con bytes.join
+    fechas = np.arange(p.desde + primer_dia, p.desde + primer_dia + num_dias).astype(str)
+    prefijos = np.array([f'{f},'.encode() for f in fechas], dtype=object)
+    sufijos = np.array([f'{prod},{c},{precio!r}\n'.encode()
+                        for prod, precio in zip(p.productos, p.precios)
+                        for c in range(1, p.cantidad_max + 1)], dtype=object)
+    partes = np.empty(2 * n, dtype=object)
+    partes[0::2] = prefijos[dia]
+    partes[1::2] = sufijos[producto * p.cantidad_max + cantidad - 1]
+    return b''.join(partes)
+
+
+def escribir_shard(parametros, bloques, ruta):
+    """Escribe en ruta (con cabecera) los bloques dados; devuelve el número de filas."""
+    filas = 0
+    with open(ruta, 'wb') as f:
+        f.write(CABECERA)
+        for i in bloques:
+            datos = generar_bloque(parametros, i)
+            filas += datos.count(b'\n')
+            f.write(datos)
+    return filas
+
+
+def escribir_archivo(parametros, ruta, procesos):
+    """Escribe todos los bloques en orden en un único archivo; devuelve el número de filas."""
+    filas = 0
+    with open(ruta, 'wb') as f:
+        f.write(CABECERA)
+        if procesos <= 1:
+            for i in range(parametros.num_bloques):
+                datos = generar_bloque(parametros, i)
+                filas += datos.count(b'\n')
+                f.write(datos)
+            return filas
+        with ProcessPoolExecutor(procesos) as ejecutor:
+            # Como mucho 2 bloques por proceso en vuelo: la memoria no crece con el archivo
+            pendientes = deque()
+            siguiente = 0
+            while siguiente < parametros.num_bloques or pendientes:
+                while siguiente < parametros.num_bloques and len(pendientes) < 2 * procesos:
+                    pendientes.append(ejecutor.submit(generar_bloque, parametros, siguiente))
+                    siguiente += 1
+                datos = pendientes.popleft().result()
+                filas += datos.count(b'\n')
+                f.write(datos)
+    return filas
+
+
+def escribir_shards(parametros, ruta, shards, procesos):
+    """Reparte los bloques en shards archivos consecutivos (ventas-00000.csv...) generados en paralelo."""
+    base, extension = os.path.splitext(ruta)
+    repartos = np.array_split(np.arange(parametros.num_bloques), shards)
+    rutas = [f'{base}-{i:05d}{extension}' for i in range(shards)]
+    with ProcessPoolExecutor(max(1, procesos)) as ejecutor:
+        filas = sum(ejecutor.map(escribir_shard, [parametros] * shards, [r.tolist() for r in repartos], rutas))
+    return filas, rutas
+
+
+def fecha(texto):
+    return date.fromisoformat(texto)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Genera datos sintéticos de ventas en CSV.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Ejemplos:
+  python generar_datos_ventas.py                                   # ene-mar 2025, 2-8 ventas/día
+  python generar_datos_ventas.py --semilla 1 -o ventas_1m.csv --desde 2020-01-01 --hasta 2024-12-31 --filas-por-dia 500 600
+  python generar_datos_ventas.py --filas-por-dia 50000 60000 --desde 2020-01-01 --hasta 2024-12-31 -j 8   # ~100M filas
+  python generar_datos_ventas.py --productos 500 --shards 16 -j 8 -o datos/ventas.csv
+        """
+    )
+    parser.add_argument("--desde", type=fecha, default=date(2025, 1, 1),
+                        help="Primer día (AAAA-MM-DD, por defecto: 2025-01-01)")
+    parser.add_argument("--hasta", type=fecha, default=date(2025, 3, 31),
+                        help="Último día (AAAA-MM-DD, por defecto: 2025-03-31)")
+    parser.add_argument("--filas-por-dia", type=int, nargs="+", default=[2, 8], metavar="N",
+                        help="Ventas por día: un número fijo o un rango MIN MAX (por defecto: 2 8)")
+    parser.add_argument("--catalogo", help="CSV con columnas producto,precio (por defecto: productos A-H)")
+    parser.add_argument("--productos", type=int, help="Generar un catálogo sintético de N productos")
+    parser.add_argument("--cantidad-max", type=int, default=5, help="Unidades máximas por venta (por defecto: 5)")
+    parser.add_argument("--semilla", type=int, help="Semilla para obtener siempre los mismos datos")
+    parser.add_argument("-o", "--salida", default="ventas.csv", help="Archivo de salida (por defecto: ventas.csv)")
+    parser.add_argument("--filas-por-bloque", type=int, default=1_000_000,
+                        help="Filas aproximadas que se generan y escriben de una vez (por defecto: 1000000)")
+    parser.add_argument("-j", "--procesos", type=int, default=1, help="Procesos en paralelo (por defecto: 1)")
+    parser.add_argument("--shards", type=int,
+                        help="Escribir N archivos (<salida>-00000.csv...) en vez de uno solo")
+    args = parser.parse_args()
+
+    if len(args.filas_por_dia) > 2:
+        parser.error("--filas-por-dia admite un número o dos (MIN MAX)")
+    filas_min, filas_max = args.filas_por_dia[0], args.filas_por_dia[-1]
+    if not 0 <= filas_min <= filas_max:
+        parser.error("--filas-por-dia: se esperaba 0 <= MIN <= MAX")
+    if args.hasta < args.desde:
+        parser.error("--hasta es anterior a --desde")
+
+    entropia = np.random.SeedSequence(args.semilla).entropy
+    if args.catalogo:
+        catalogo = leer_catalogo(args.catalogo)
+    elif args.productos:
+        catalogo = catalogo_sintetico(args.productos, entropia)
+    else:
+        catalogo = PRECIOS_BASE
+    parametros = Parametros(args.desde, args.hasta, filas_min, filas_max, catalogo,
+                            args.cantidad_max, entropia, args.filas_por_bloque)
+
+    inicio = time.perf_counter()
+    if args.shards:
+        filas, rutas = escribir_shards(parametros, args.salida, args.shards, args.procesos)
+    else:
+        filas, rutas = escribir_archivo(parametros, args.salida, args.procesos), [args.salida]
+    segundos = time.perf_counter() - inicio
+
+    print(f"✅ Datos generados: {filas} ventas en {segundos:.1f} s ({filas / max(segundos, 1e-9):,.0f} filas/s)")
+    print(f"📅 Rango de fechas: {args.desde} a {args.hasta}")
+    print(f"📦 Productos: {len(catalogo)} ({', '.join(list(catalogo)[:8])}{'...' if len(catalogo) > 8 else ''})")
+    if args.semilla is None:
+        print(f"🎲 Semilla: {entropia} (repite con --semilla para obtener los mismos datos)")
+    print(f"💾 {len(rutas)} archivo(s): {rutas[0]}{' ...' if len(rutas) > 1 else ''}")
+    print("\nPrimeras 5 filas:")
+    with open(rutas[0], encoding='utf-8') as f:
+        for _ in range(6):
+            linea = f.readline()
+            if linea:
+                print('  ' + linea.rstrip())
+
+
+if __name__ == "__main__":
+    main()
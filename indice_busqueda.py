@@ -0,0 +1,155 @@
+"""
+Índice invertido sobre el texto de las tareas para el buscador de app.py.
+
+Las consultas son palabras separadas por espacios que deben aparecer todas (AND);
+una palabra terminada en * busca por prefijo ("compr*" encuentra "comprar" y
+"compras"). Mayúsculas y tildes no cuentan.
+"""
+
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from heapq import merge
+
+PATRON_PALABRA = re.compile(r'\w+')
+PATRON_TERMINO = re.compile(r'(\w+)(\*?)')
+PATRON_DIACRITICOS = re.compile('[\u0300-\u036f]')  # marcas combinantes que deja NFKD
+
+
+def normalizar(texto):
+    """Pasa a minúsculas y quita tildes y diéresis."""
+    if texto.isascii():
+        return texto.lower()
+    return PATRON_DIACRITICOS.sub('', unicodedata.normalize('NFKD', texto.lower()))
+
+
+def palabras(texto):
+    """Palabras normalizadas de un texto, sin repetir."""
+    return set(PATRON_PALABRA.findall(normalizar(texto)))
+
+
+def terminos(consulta):
+    """Convierte una consulta en [(palabra, es_prefijo)]."""
+    return [(palabra, bool(asterisco)) for palabra, asterisco in PATRON_TERMINO.findall(normalizar(consulta))]
+
+
+# Obsoletas que una búsqueda puede saltarse antes de purgar las listas que recorre
+MAX_OBSOLETAS = 1000
+
+
+class IndiceInvertido:
+    """
+    Para cada palabra, dos listas ordenadas de ids: las tareas pendientes y las
+    completadas que la contienen.
+
+    Al separar los dos grupos, una búsqueda recorre las pendientes y se detiene
+    en cuanto tiene limite resultados, aunque la mayoría de las tareas estén
+    completadas. Completar una tarea la inserta en las listas de completadas;
+    en las de pendientes se queda como obsoleta (es_pendiente(id) la descarta)
+    hasta que se purga la lista: al completar, si las obsoletas son la mitad,
+    y al buscar, si la búsqueda se salta más de MAX_OBSOLETAS.
+
+    Los ids llegan casi siempre en orden creciente, así que añadir es un append.
+    Las palabras nuevas esperan a la siguiente búsqueda por prefijo para entrar
+    en el vocabulario ordenado.
+    """
+
+    def __init__(self, es_pendiente):
+        self.es_pendiente = es_pendiente
+        self._pendientes = {}  # palabra -> ids de tareas pendientes (y obsoletas)
+        self._completadas = {}  # palabra -> ids de tareas completadas
+        self._obsoletas = {}  # palabra -> ids completados que siguen en _pendientes
+        self._vocabulario = []  # palabras ordenadas, para buscar por prefijo
+        self._palabras_nuevas = []
+
+    def agregar(self, id, texto, hecho=False):
+        grupo = self._completadas if hecho else self._pendientes
+        for palabra in palabras(texto):
+            if palabra not in self._pendientes:
+                self._pendientes[palabra] = []
+                self._completadas[palabra] = []
+                self._palabras_nuevas.append(palabra)
+            _insertar(grupo[palabra], id)
+
+    def completar(self, id, texto):
+        """Pasa una tarea (ya marcada como completada) de las listas de pendientes a las de completadas."""
+        for palabra in palabras(texto):
+            _insertar(self._completadas[palabra], id)
+            self._obsoletas[palabra] = self._obsoletas.get(palabra, 0) + 1
+            if 2 * self._obsoletas[palabra] >= len(self._pendientes[palabra]):
+                self._purgar(palabra)
+
+    def _purgar(self, palabra):
+        """Quita de las pendientes de palabra los ids ya completados."""
+        self._pendientes[palabra][:] = [id for id in self._pendientes[palabra] if self.es_pendiente(id)]
+        self._obsoletas[palabra] = 0
+
+    def _palabras_de(self, palabra, prefijo):
+        """Palabras del vocabulario que cubre un término de la consulta."""
+        if not prefijo:
+            return [palabra] if palabra in self._pendientes else []
+        if len(self._palabras_nuevas) > 100:
+            self._vocabulario.extend(self._palabras_nuevas)
+            self._vocabulario.sort()
+        else:
+            for nueva in self._palabras_nuevas:
+                insort(self._vocabulario, nueva)
+        self._palabras_nuevas = []
+        i = bisect_left(self._vocabulario, palabra)
+        return self._vocabulario[i:bisect_left(self._vocabulario, palabra + '\U0010ffff', i)]
+
+    def buscar(self, consulta, limite=None):
+        """
+        Ids que contienen todos los términos: primero las pendientes y luego las
+        completadas, cada grupo por id.
+        """
+        por_termino = [self._palabras_de(p, prefijo) for p, prefijo in terminos(consulta)]
+        if not por_termino or not all(por_termino):
+            return []
+        encontrados = []
+        for grupo in (self._pendientes, self._completadas):
+            # Se recorre el término con menos ids y se comprueba el resto por bisección
+            listas = sorted(([grupo[p] for p in ps] for ps in por_termino), key=lambda ls: sum(map(len, ls)))
+            guia, resto = listas[0], listas[1:]
+            obsoletas = 0
+            for id in _recorrer(guia):
+                if len(encontrados) == limite:
+                    return encontrados
+                if grupo is self._pendientes and not self.es_pendiente(id):
+                    obsoletas += 1
+                    if obsoletas > MAX_OBSOLETAS:
+                        for coincidencias in por_termino:
+                            for palabra in coincidencias:
+                                if self._obsoletas.get(palabra):
+                                    self._purgar(palabra)
+                        return self.buscar(consulta, limite)
+                    continue
+                if all(any(_contiene(ids, id) for ids in ls) for ls in resto):
+                    encontrados.append(id)
+        return encontrados
+
+
+def _recorrer(listas):
+    """Ids de varias listas ordenadas, en orden y sin repetir."""
+    if len(listas) == 1:
+        yield from listas[0]
+        return
+    anterior = None
+    for id in merge(*listas):
+        if id != anterior:
+            yield id
+            anterior = id
+
+
+def _insertar(ids, id):
+    if not ids or id > ids[-1]:
+        ids.append(id)
+    else:
+        i = bisect_left(ids, id)
+        if i == len(ids) or ids[i] != id:
+            ids.insert(i, id)
+
+
+def _contiene(ids, id):
+    i = bisect_left(ids, id)
+    return i < len(ids) and ids[i] == id
@@ -0,0 +1,294 @@
+"""
+Índice de tareas en columnas para listas muy grandes.
+
+Ofrece la misma interfaz que IndiceTareas, pero en lugar de un diccionario por
+tarea guarda cada campo en un arreglo compacto: ids en array('q'), textos UTF-8
+seguidos en un único bytearray y el estado en un byte por tarea. Con millones
+de tareas ocupa una fracción de la memoria; los diccionarios solo se crean al
+recorrer o consultar.
+
+Las columnas también pueden ser vistas de solo lectura sobre un archivo mapeado
+en memoria (instantanea_binaria.py); se copian a arreglos propios en el primer
+cambio.
+"""
+
+from array import array
+from bisect import bisect_left
+from itertools import accumulate, compress
+from operator import mul
+
+from indice_busqueda import IndiceInvertido
+
+
+class IndiceCompacto:
+    """
+    Tareas en columnas ordenadas por id.
+
+    Las pendientes se recorren por id (que es su orden de creación) y las
+    completadas en el orden en que se completaron, igual que IndiceTareas.
+    Las tareas que devuelve son copias: modificarlas no cambia el índice.
+    """
+
+    def __init__(self, tareas=()):
+        self._ids = array('q')
+        self._inicios = array('q', [0])  # el texto i ocupa _textos[_inicios[i]:_inicios[i + 1]]
+        self._textos = bytearray()
+        self._hechas = bytearray()  # 1 si la tarea está completada; find(0) salta a la siguiente pendiente
+        self._orden = array('q')  # posición + 1 de cada tarea en _completadas (0 si está pendiente)
+        self._completadas = array('q')  # ids en orden de completado
+        self._busqueda = None  # índice invertido, ver preparar_busqueda()
+        self._solo_lectura = False
+        tareas = list(tareas)
+        if tareas:
+            self._construir(
+                [tarea['id'] for tarea in tareas],
+                [tarea['texto'].encode('utf-8') for tarea in tareas],
+                [1 if tarea['hecho'] else 0 for tarea in tareas],
+            )
+
+    @classmethod
+    def desde_columnas(cls, ids, inicios, orden, completadas, hechas, textos):
+        """
+        Crea un índice sobre columnas ya construidas (p. ej. memoryview de un mmap) sin copiarlas.
+
+        Solo se copia hechas, un byte por tarea, porque el recorrido necesita find().
+        """
+        indice = cls()
+        indice._ids, indice._inicios, indice._orden, indice._completadas = ids, inicios, orden, completadas
+        indice._hechas = bytearray(hechas)
+        indice._textos = textos
+        indice._solo_lectura = True
+        return indice
+
+    def columnas(self):
+        """(ids, inicios, orden, completadas, hechas, textos), en el formato de desde_columnas()."""
+        return self._ids, self._inicios, self._orden, self._completadas, self._hechas, self._textos
+
+    def instantanea(self):
+        """Copia independiente del índice, para serializarla sin bloquear los cambios."""
+        copia = IndiceCompacto()
+        for nombre in ('_ids', '_inicios', '_orden', '_completadas'):
+            columna = array('q')
+            columna.frombytes(memoryview(getattr(self, nombre)).cast('B'))
+            setattr(copia, nombre, columna)
+        copia._hechas = bytearray(self._hechas)
+        copia._textos = bytearray(self._textos)
+        return copia
+
+    def _materializar(self):
+        """Sustituye las vistas de solo lectura por arreglos propios antes del primer cambio."""
+        copia = self.instantanea()
+        self._ids, self._inicios, self._orden, self._completadas, self._hechas, self._textos = copia.columnas()
+        self._solo_lectura = False
+
+    def _anadir(self, id, texto, hecho):
+        if self._solo_lectura:
+            self._materializar()
+        self._ids.append(id)
+        self._textos += texto.encode('utf-8')
+        self._inicios.append(len(self._textos))
+        self._hechas.append(1 if hecho else 0)
+        self._orden.append(0)
+        if hecho:
+            self._completadas.append(id)
+            self._orden[-1] = len(self._completadas)
+
+    def _construir(self, ids, textos, hechas):
+        """
+        Rellena las columnas de una vez a partir de listas en cualquier orden.
+
+        Una instantánea trae dos tramos: pendientes por id y completadas en
+        orden de completado. sorted() (timsort) aprovecha los tramos ya
+        ordenados, así que reordenar cuesta poco más que una mezcla; las
+        columnas se copian en C con map/join en lugar de elemento a elemento.
+        Si un id se repite se queda el primero.
+        """
+        orden = sorted(range(len(ids)), key=ids.__getitem__)
+        repetidos = len(set(ids)) != len(ids)
+        if repetidos:
+            # sorted() es estable: entre ids iguales el primero es el original
+            orden = [i for k, i in enumerate(orden) if k == 0 or ids[i] != ids[orden[k - 1]]]
+        # array() se rellena antes desde una lista que desde un iterador
+        self._ids = array('q', list(map(ids.__getitem__, orden)))
+        self._textos = bytearray(b''.join(map(textos.__getitem__, orden)))
+        longitudes = list(map(len, textos))
+        self._inicios = array('q', list(accumulate(map(longitudes.__getitem__, orden), initial=0)))
+        self._hechas = bytearray(map(hechas.__getitem__, orden))
+        if not repetidos:
+            # Puesto de cada tarea entre las completadas, en el orden de entrada
+            puestos = list(map(mul, accumulate(hechas), hechas))
+            self._orden = array('q', list(map(puestos.__getitem__, orden)))
+            self._completadas = array('q', compress(ids, hechas))
+            return
+        self._orden = array('q', bytes(8 * len(self._ids)))
+        self._completadas = array('q')
+        for id in compress(ids, hechas):
+            posicion = self._posicion(id)
+            if self._hechas[posicion] and not self._orden[posicion]:
+                self._completadas.append(id)
+                self._orden[posicion] = len(self._completadas)
+
+    def _insertar(self, i, id, texto, hecho):
+        """Inserta una tarea en la posición i sin reordenar el resto de columnas."""
+        if self._solo_lectura:
+            self._materializar()
+        datos = texto.encode('utf-8')
+        inicio = self._inicios[i]
+        self._ids.insert(i, id)
+        self._textos[inicio:inicio] = datos
+        # Los textos siguientes se desplazan: solo cambia la cola de _inicios
+        cola = self._inicios[i + 1:]
+        self._inicios[i + 1:] = array('q', [inicio + len(datos)]) + array('q', [x + len(datos) for x in cola])
+        self._hechas.insert(i, 1 if hecho else 0)
+        # _orden guarda el puesto en _completadas, no posiciones: no hay que desplazarlo
+        self._orden.insert(i, 0)
+        if hecho:
+            self._completadas.append(id)
+            self._orden[i] = len(self._completadas)
+
+    def _posicion(self, id):
+        """Posición de un id en las columnas, o None si no está."""
+        ids = self._ids
+        if not ids:
+            return None
+        # Los ids suelen ser consecutivos: se prueba primero la posición directa
+        i = id - ids[0]
+        if 0 <= i < len(ids) and ids[i] == id:
+            return i
+        i = bisect_left(ids, id)
+        if i < len(ids) and ids[i] == id:
+            return i
+        return None
+
+    def _texto(self, i):
+        return str(self._textos[self._inicios[i]:self._inicios[i + 1]], 'utf-8')
+
+    def _tarea(self, i):
+        return {
+            'id': self._ids[i],
+            'texto': self._texto(i),
+            'hecho': bool(self._hechas[i]),
+        }
+
+    def agregar(self, tarea):
+        """Añade una tarea ({'id', 'texto', 'hecho'}). Un id repetido se ignora."""
+        id = tarea['id']
+        if self._ids and id <= self._ids[-1]:
+            i = bisect_left(self._ids, id)
+            if self._ids[i] == id:
+                return
+            # Id menor que el último: poco habitual, se inserta en su sitio
+            self._insertar(i, id, tarea['texto'], tarea['hecho'])
+        else:
+            self._anadir(id, tarea['texto'], tarea['hecho'])
+        if self._busqueda is not None:
+            self._busqueda.agregar(id, tarea['texto'], tarea['hecho'])
+
+    def completar(self, id):
+        """Pasa una tarea pendiente al final de las completadas. Devuelve False si no estaba pendiente."""
+        i = self._posicion(id)
+        if i is None or self._hechas[i]:
+            return False
+        if self._solo_lectura:
+            self._materializar()
+        self._hechas[i] = 1
+        self._completadas.append(id)
+        self._orden[i] = len(self._completadas)
+        if self._busqueda is not None:
+            self._busqueda.completar(id, self._texto(i))
+        return True
+
+    def obtener(self, id):
+        i = self._posicion(id)
+        return None if i is None else self._tarea(i)
+
+    def _es_pendiente(self, id):
+        return not self._hechas[self._posicion(id)]
+
+    @property
+    def busqueda_preparada(self):
+        """True si el índice invertido ya existe (buscar no tendrá que construirlo)."""
+        return self._busqueda is not None
+
+    def preparar_busqueda(self):
+        """Construye el índice invertido si aún no existe."""
+        if self._busqueda is None:
+            busqueda = IndiceInvertido(self._es_pendiente)
+            for i, id in enumerate(self._ids):
+                busqueda.agregar(id, self._texto(i), self._hechas[i])
+            self._busqueda = busqueda
+
+    def heredar_busqueda(self, anterior):
+        """
+        Adopta el índice invertido de anterior (un estado más antiguo de estas
+        mismas tareas) y lo pone al día con las creadas y completadas desde
+        entonces. No hace nada si anterior no lo tiene o si los estados no cuadran.
+        """
+        busqueda = getattr(anterior, '_busqueda', None)
+        if self._busqueda is not None or busqueda is None or not isinstance(anterior, IndiceCompacto):
+            return
+        # Los ids solo crecen: las tareas de anterior son las primeras de estas y
+        # sus completadas, las primeras de estas en orden de completado
+        n, m = len(anterior._ids), len(anterior._completadas)
+        if (n > len(self._ids) or m > len(self._completadas)
+                or memoryview(self._ids)[:n] != memoryview(anterior._ids)[:n]
+                or memoryview(self._completadas)[:m] != memoryview(anterior._completadas)[:m]):
+            return
+        busqueda.es_pendiente = self._es_pendiente
+        for i in range(n, len(self._ids)):
+            busqueda.agregar(self._ids[i], self._texto(i), self._hechas[i])
+        for id in self._completadas[m:]:
+            i = self._posicion(id)
+            if i < n:
+                busqueda.completar(id, self._texto(i))
+        self._busqueda = busqueda
+
+    def buscar(self, consulta, limite=None):
+        """Tareas cuyo texto contiene todos los términos de la consulta, pendientes primero."""
+        self.preparar_busqueda()
+        ids = self._busqueda.buscar(consulta, limite)
+        return [self.obtener(id) for id in ids]
+
+    def iterar(self, despues_de=None):
+        """
+        Recorre pendientes y luego completadas, opcionalmente a partir de un id.
+
+        Un id desconocido no devuelve nada.
+        """
+        if despues_de is None:
+            inicio, completada = 0, 0
+        else:
+            i = self._posicion(despues_de)
+            if i is None:
+                return
+            if self._hechas[i]:
+                inicio, completada = None, self._orden[i]
+            else:
+                inicio, completada = i + 1, 0
+        if inicio is not None:
+            while True:
+                inicio = self._hechas.find(0, inicio)
+                if inicio < 0:
+                    break
+                yield self._tarea(inicio)
+                inicio += 1
+        while completada < len(self._completadas):
+            yield self._tarea(self._posicion(self._completadas[completada]))
+            completada += 1
+
+    def __contains__(self, id):
+        return self._posicion(id) is not None
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __iter__(self):
+        return self.iterar()
+
+    @property
+    def num_pendientes(self):
+        return len(self._ids) - len(self._completadas)
+
+    @property
+    def num_completadas(self):
+        return len(self._completadas)
@@ -0,0 +1,192 @@
+"""
+Índice en memoria de las tareas: búsqueda por id en O(1) y dos vistas ya
+ordenadas (pendientes y completadas) para listar sin ordenar.
+"""
+
+from indice_busqueda import IndiceInvertido
+
+
+class GrupoOrdenado:
+    """
+    Tareas en orden de inserción con altas, bajas y búsqueda en O(1).
+
+    Es una lista doblemente enlazada sobre diccionarios, de modo que también se
+    puede seguir recorriendo a partir de cualquier id (paginación por cursor).
+    """
+
+    def __init__(self):
+        self._tareas = {}
+        self._siguiente = {}
+        self._anterior = {}
+        self._primero = None
+        self._ultimo = None
+
+    def anadir(self, tarea):
+        """Añade una tarea al final del grupo."""
+        id = tarea['id']
+        self._tareas[id] = tarea
+        self._anterior[id] = self._ultimo
+        self._siguiente[id] = None
+        if self._ultimo is None:
+            self._primero = id
+        else:
+            self._siguiente[self._ultimo] = id
+        self._ultimo = id
+
+    def quitar(self, id):
+        """Saca una tarea del grupo y la devuelve (None si no estaba)."""
+        tarea = self._tareas.pop(id, None)
+        if tarea is None:
+            return None
+        anterior = self._anterior.pop(id)
+        siguiente = self._siguiente.pop(id)
+        if anterior is None:
+            self._primero = siguiente
+        else:
+            self._siguiente[anterior] = siguiente
+        if siguiente is None:
+            self._ultimo = anterior
+        else:
+            self._anterior[siguiente] = anterior
+        return tarea
+
+    def iterar(self, despues_de=None):
+        """Recorre el grupo desde el principio o desde la tarea siguiente a despues_de."""
+        id = self._primero if despues_de is None else self._siguiente.get(despues_de)
+        while id is not None:
+            tarea = self._tareas.get(id)
+            if tarea is None:
+                # Se movió a otro grupo mientras se recorría
+                return
+            siguiente = self._siguiente.get(id)
+            yield tarea
+            id = siguiente
+
+    def __contains__(self, id):
+        return id in self._tareas
+
+    def __len__(self):
+        return len(self._tareas)
+
+
+class IndiceTareas:
+    """
+    Tareas indexadas por id y repartidas en dos grupos que conservan el orden de inserción.
+
+    Las pendientes quedan en orden de creación y las completadas en el orden en
+    que se completaron. Recorrer el índice devuelve primero las pendientes.
+    """
+
+    def __init__(self, tareas=()):
+        self._por_id = {}
+        self._pendientes = GrupoOrdenado()
+        self._completadas = GrupoOrdenado()
+        self._busqueda = None  # índice invertido, ver preparar_busqueda()
+        for tarea in tareas:
+            self.agregar(tarea)
+
+    def agregar(self, tarea):
+        """Añade una tarea ({'id', 'texto', 'hecho'}) al final de su grupo. Un id repetido se ignora."""
+        if tarea['id'] in self._por_id:
+            return
+        self._por_id[tarea['id']] = tarea
+        grupo = self._completadas if tarea['hecho'] else self._pendientes
+        grupo.anadir(tarea)
+        if self._busqueda is not None:
+            self._busqueda.agregar(tarea['id'], tarea['texto'], tarea['hecho'])
+
+    def completar(self, id):
+        """Pasa una tarea pendiente al final de las completadas. Devuelve False si no estaba pendiente."""
+        tarea = self._pendientes.quitar(id)
+        if tarea is None:
+            return False
+        tarea['hecho'] = True
+        self._completadas.anadir(tarea)
+        if self._busqueda is not None:
+            self._busqueda.completar(id, tarea['texto'])
+        return True
+
+    def obtener(self, id):
+        return self._por_id.get(id)
+
+    def instantanea(self):
+        """Lista de las tareas en el orden del listado, para serializarla sin bloquear los cambios."""
+        return list(self)
+
+    def _es_pendiente(self, id):
+        return not self._por_id[id]['hecho']
+
+    @property
+    def busqueda_preparada(self):
+        """True si el índice invertido ya existe (buscar no tendrá que construirlo)."""
+        return self._busqueda is not None
+
+    def preparar_busqueda(self):
+        """Construye el índice invertido si aún no existe."""
+        if self._busqueda is None:
+            busqueda = IndiceInvertido(self._es_pendiente)
+            for id, tarea in sorted(self._por_id.items()):
+                busqueda.agregar(id, tarea['texto'], tarea['hecho'])
+            self._busqueda = busqueda
+
+    def heredar_busqueda(self, anterior):
+        """
+        Adopta el índice invertido de anterior (un estado más antiguo de estas
+        mismas tareas) y lo pone al día con las creadas y completadas desde
+        entonces. No hace nada si anterior no lo tiene o si los estados no cuadran.
+        """
+        busqueda = getattr(anterior, '_busqueda', None)
+        if self._busqueda is not None or busqueda is None or not isinstance(anterior, IndiceTareas):
+            return
+        nuevas, completadas = [], []
+        for id, tarea in self._por_id.items():
+            previa = anterior._por_id.get(id)
+            if previa is None:
+                nuevas.append(tarea)
+            elif previa['hecho'] != tarea['hecho']:
+                if previa['hecho']:
+                    return
+                completadas.append(tarea)
+        if len(self._por_id) - len(nuevas) != len(anterior):
+            return
+        busqueda.es_pendiente = self._es_pendiente
+        for tarea in sorted(nuevas, key=lambda t: t['id']):
+            busqueda.agregar(tarea['id'], tarea['texto'], tarea['hecho'])
+        for tarea in completadas:
+            busqueda.completar(tarea['id'], tarea['texto'])
+        self._busqueda = busqueda
+
+    def buscar(self, consulta, limite=None):
+        """Tareas cuyo texto contiene todos los términos de la consulta, pendientes primero."""
+        self.preparar_busqueda()
+        ids = self._busqueda.buscar(consulta, limite)
+        return [self._por_id[id] for id in ids]
+
+    def iterar(self, despues_de=None):
+        """
+        Recorre pendientes y luego completadas, opcionalmente a partir de un id.
+
+        Un id desconocido no devuelve nada.
+        """
+        if despues_de is None or despues_de in self._pendientes:
+            yield from self._pendientes.iterar(despues_de)
+            yield from self._completadas.iterar()
+        elif despues_de in self._completadas:
+            yield from self._completadas.iterar(despues_de)
+
+    def __contains__(self, id):
+        return id in self._por_id
+
+    def __len__(self):
+        return len(self._por_id)
+
+    def __iter__(self):
+        return self.iterar()
+
+    @property
+    def num_pendientes(self):
+        return len(self._pendientes)
+
+    @property
+    def num_completadas(self):
+        return len(self._completadas)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Instantánea binaria de las tareas, pensada para mapearse en memoria al arrancar.
+
+El archivo guarda tal cual las columnas de IndiceCompacto, así que cargarlo no
+decodifica nada: se mapea con mmap y cada tarea se convierte en diccionario
+solo cuando se recorre. El tiempo de arranque apenas depende del número de
+tareas. El JSON sigue sirviendo para exportar e importar:
+
+    python instantanea_binaria.py exportar tareas.bin tareas.json
+    python instantanea_binaria.py importar tareas.json tareas.bin
+
+Formato (enteros de 8 bytes en el orden de bytes de la máquina, secciones
+alineadas a 8 bytes): cabecera, ids, inicios de texto, orden de completado,
+ids completados, un byte de estado por tarea y los textos UTF-8.
+"""
+
+import argparse
+import mmap
+import struct
+import sys
+
+from indice_compacto import IndiceCompacto
+
+EXTENSION = '.bin'
+MAGICO = b'TAREASLE' if sys.byteorder == 'little' else b'TAREASBE'
+CABECERA = struct.Struct('=8sqqqq')  # mágico, tareas, completadas, siguiente_id, bytes de texto
+
+
+def _relleno(n):
+    return -n % 8
+
+
+def escribir_binaria(f, tareas, siguiente_id):
+    """Escribe en el archivo binario abierto f las tareas (un IndiceCompacto o cualquier iterable de tareas)."""
+    indice = tareas if isinstance(tareas, IndiceCompacto) else IndiceCompacto(tareas)
+    ids, inicios, orden, completadas, hechas, textos = indice.columnas()
+    f.write(CABECERA.pack(MAGICO, len(ids), len(completadas), siguiente_id, len(textos)))
+    for columna in (ids, inicios, orden, completadas):
+        f.write(columna)
+    f.write(hechas)
+    f.write(bytes(_relleno(len(hechas))))
+    f.write(textos)
+
+
+def leer_binaria(ruta):
+    """
+    Mapea una instantánea binaria y devuelve (IndiceCompacto, siguiente_id).
+
+    Las columnas quedan como vistas sobre el mapa; si falta el archivo se
+    devuelve un índice vacío.
+    """
+    try:
+        with open(ruta, 'rb') as f:
+            mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        return IndiceCompacto(), 1
+    # El mapa sigue abierto mientras alguna vista lo use, aunque se sustituya el archivo
+    vista = memoryview(mapa)
+    magico, n, m, siguiente_id, bytes_texto = CABECERA.unpack_from(vista)
+    if magico != MAGICO:
+        raise ValueError(f'{ruta} no es una instantánea binaria de esta arquitectura; '
+                         'vuelve a generarla desde el JSON con "importar"')
+    posicion = CABECERA.size
+    columnas = []
+    for longitud in (n, n + 1, n, m):
+        columnas.append(vista[posicion:posicion + 8 * longitud].cast('q'))
+        posicion += 8 * longitud
+    hechas = vista[posicion:posicion + n]
+    posicion += n + _relleno(n)
+    textos = vista[posicion:posicion + bytes_texto]
+    ids, inicios, orden, completadas = columnas
+    return IndiceCompacto.desde_columnas(ids, inicios, orden, completadas, hechas, textos), siguiente_id
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convierte instantáneas de tareas entre JSON y binario.",
+        epilog="Con la aplicación parada: el destino se sustituye de forma atómica."
+    )
+    parser.add_argument("accion", choices=["exportar", "importar"],
+                        help="exportar: binario → JSON; importar: JSON → binario")
+    parser.add_argument("origen", help="Archivo de origen")
+    parser.add_argument("destino", help="Archivo de destino")
+    args = parser.parse_args()
+
+    from almacenamiento import leer_instantanea, escribir_instantanea
+
+    if args.accion == 'exportar' and not args.origen.endswith(EXTENSION):
+        parser.error(f"el origen de 'exportar' debe terminar en {EXTENSION}")
+    if args.accion == 'importar' and not args.destino.endswith(EXTENSION):
+        parser.error(f"el destino de 'importar' debe terminar en {EXTENSION}")
+    indice, siguiente_id = leer_instantanea(args.origen, IndiceCompacto)
+    escribir_instantanea(args.destino, indice, siguiente_id)
+    print(f"✅ {len(indice)} tareas: {args.origen} → {args.destino}")
+
+
+if __name__ == "__main__":
+    main()
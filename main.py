@@ -1,117 +1,207 @@
-import pandas as pd
-import matplotlib
-matplotlib.use('Agg')  # Backend no interactivo
-import matplotlib.pyplot as plt
-
-# 1. Cargar datos del CSV
-print("=" * 60)
-print("ANÁLISIS DE VENTAS")
-print("=" * 60)
-
-df = pd.read_csv('ventas.csv', parse_dates=['fecha'])
-
-# Verificar tipos de datos
-print("\n📊 Información del dataset:")
-print(f"Total de registros: {len(df)}")
-print(f"\nTipos de datos:")
-print(df.dtypes)
-print(f"\nPrimeras filas:")
-print(df.head())
-
-# Asegurar que cantidad y precio son numéricos
-df['cantidad'] = pd.to_numeric(df['cantidad'])
-df['precio'] = pd.to_numeric(df['precio'])
-
-# 2. Calcular ventas totales por mes
-print("\n" + "=" * 60)
-print("VENTAS POR MES")
-print("=" * 60)
-
-# Crear columna de mes
-df['mes'] = df['fecha'].dt.to_period('M')
-
-# Calcular ingresos por venta
-df['ingreso'] = df['cantidad'] * df['precio']
-
-# Agrupar por mes y sumar ingresos
-ventas_por_mes = df.groupby('mes')['ingreso'].sum().sort_index()
-
-print("\nVentas totales por mes:")
-print(ventas_por_mes.to_frame())
-print(f"\nTotal general: {ventas_por_mes.sum():.2f} €")
-
-# 3. Determinar producto más vendido y con mayor ingresos
-print("\n" + "=" * 60)
-print("ANÁLISIS POR PRODUCTO")
-print("=" * 60)
-
-# Agrupar por producto
-ventas_prod = df.groupby('producto').agg({
-    'cantidad': 'sum',
-    'ingreso': 'sum'
-}).sort_values('ingreso', ascending=False)
-
-print("\nResumen por producto:")
-print(ventas_prod)
-
-# Producto más vendido en cantidad
-mas_vendido = ventas_prod['cantidad'].idxmax()
-cantidad_total = ventas_prod.loc[mas_vendido, 'cantidad']
-
-# Producto con mayores ingresos
-mayor_ingreso = ventas_prod['ingreso'].idxmax()
-ingreso_total = ventas_prod.loc[mayor_ingreso, 'ingreso']
-
-print(f"\n🏆 Producto más vendido (en unidades): {mas_vendido}")
-print(f"   Total: {cantidad_total} unidades")
-
-print(f"\n💰 Producto con mayores ingresos: {mayor_ingreso}")
-print(f"   Total: {ingreso_total:.2f} €")
-
-# 4. Graficar ventas por mes
-print("\n" + "=" * 60)
-print("GENERANDO GRÁFICOS...")
-print("=" * 60)
-
-# Convertir índice Period a string para mejor visualización
-ventas_por_mes_str = ventas_por_mes.copy()
-ventas_por_mes_str.index = ventas_por_mes_str.index.astype(str)
-
-plt.figure(figsize=(10, 6))
-ventas_por_mes_str.plot(kind='bar', color='steelblue', edgecolor='black')
-plt.title("Ventas por Mes", fontsize=16, fontweight='bold')
-plt.xlabel("Mes", fontsize=12)
-plt.ylabel("Ventas (€)", fontsize=12)
-plt.xticks(rotation=45)
-plt.grid(axis='y', alpha=0.3)
-plt.tight_layout()
-plt.savefig("ventas_por_mes.png", dpi=150, bbox_inches='tight')
-print("✅ Gráfico guardado: ventas_por_mes.png")
-plt.close()
-
-# 5. Graficar top 5 productos por ingresos
-top5 = ventas_prod.nlargest(5, 'ingreso')
-
-plt.figure(figsize=(10, 6))
-plt.bar(top5.index, top5['ingreso'], color='coral', edgecolor='black')
-plt.title("Top 5 Productos por Ingresos", fontsize=16, fontweight='bold')
-plt.ylabel("Ingresos (€)", fontsize=12)
-plt.xlabel("Producto", fontsize=12)
-plt.xticks(rotation=0)
-plt.grid(axis='y', alpha=0.3)
-
-# Añadir valores en las barras
-for i, v in enumerate(top5['ingreso']):
-    plt.text(i, v, f'{v:.0f}€', ha='center', va='bottom', fontweight='bold')
-
-plt.tight_layout()
-plt.savefig("top5_productos.png", dpi=150, bbox_inches='tight')
-print("✅ Gráfico guardado: top5_productos.png")
-plt.close()
-
-print("\n" + "=" * 60)
-print("✅ ANÁLISIS COMPLETADO")
-print("=" * 60)
-print("\nArchivos generados:")
-print("  - ventas_por_mes.png")
-print("  - top5_productos.png")
+#!/usr/bin/env python3
+"""
+Análisis de ventas: ingresos por mes, productos más vendidos y gráficos.
+
+Por defecto carga el CSV entero. Con --streaming lo lee por bloques y solo
+guarda los agregados, así la memoria depende de --filas-por-bloque y no del
+tamaño del archivo; los resultados y los gráficos son los mismos. Con
+--workers N el archivo se reparte por rangos de bytes entre N procesos. Con
+--cache las columnas ya convertidas se guardan junto al CSV y las siguientes
+ejecuciones las leen mapeadas en memoria mientras el CSV no cambie. Con
+--incremental se guardan los agregados y solo se procesan las filas añadidas
+desde la ejecución anterior. Con --tipos-compactos el CSV se lee con un
+esquema explícito (producto categórico, cantidad int16, precio float32).
+
+Los gráficos solo se vuelven a dibujar si cambian sus datos u opciones, y si
+hay varios pendientes se dibujan en paralelo (ver ventas_graficos.py).
+
+También se puede importar: analizar_ventas(), resultados() y
+generar_graficos(). pandas y matplotlib se importan solo cuando hacen falta,
+así que "--informe json" (o --no-graficos) no llega a cargar matplotlib.
+"""
+
+import argparse
+import json
+import os
+
+
+def analizar_ventas(archivo="ventas.csv", streaming=False, filas_por_bloque=1_000_000, workers=1,
+                    cache=False, incremental=False, tipos_compactos=False):
+    """Analisis (ventas.Analisis) de archivo con el modo de lectura elegido (solo uno)."""
+    modos = [streaming or tipos_compactos, workers != 1, cache, incremental]
+    if sum(map(bool, modos)) > 1:
+        raise ValueError("Elige un único modo de lectura: streaming/tipos_compactos, workers, cache o incremental")
+    if incremental:
+        from ventas_incremental import actualizar
+        return actualizar(archivo, filas_por_bloque)[0]
+    if cache:
+        from ventas_cache import analizar_con_cache
+        return analizar_con_cache(archivo, filas_por_bloque)
+    if workers != 1:
+        from ventas_paralelo import analizar_en_paralelo
+        return analizar_en_paralelo(archivo, workers, filas_por_bloque)
+    from ventas import analizar
+    return analizar(archivo, filas_por_bloque if streaming else None, compacto=tipos_compactos)
+
+
+def resultados(analisis):
+    """Los resultados del informe como diccionario serializable en JSON."""
+    from ventas import destacados
+    mas_vendido, cantidad_total, mayor_ingreso, ingreso_total = destacados(analisis.ventas_prod)
+    return {
+        'filas': int(analisis.filas),
+        'tipos': {columna: str(tipo) for columna, tipo in analisis.tipos.items()},
+        'ventas_por_mes': {str(mes): float(v) for mes, v in analisis.ventas_por_mes.items()},
+        'total_general': float(analisis.ventas_por_mes.sum()),
+        'ventas_por_producto': [
+            {'producto': str(p), 'cantidad': int(fila.cantidad), 'ingreso': float(fila.ingreso)}
+            for p, fila in analisis.ventas_prod.iterrows()
+        ],
+        'mas_vendido': {'producto': str(mas_vendido), 'cantidad': int(cantidad_total)},
+        'mayor_ingreso': {'producto': str(mayor_ingreso), 'ingreso': float(ingreso_total)},
+    }
+
+
+def generar_graficos(analisis, archivo="ventas.csv", formato="png", dpi=150, por_producto=False,
+                     por_mes=False, carpeta="graficos", procesos=None, filas_por_bloque=1_000_000):
+    """Dibuja los gráficos que no estén al día; devuelve [(ruta, dibujado)]."""
+    from ventas_graficos import grafico_meses, grafico_top, graficos_por_mes, graficos_por_producto, renderizar
+    graficos = [
+        grafico_meses(analisis.ventas_por_mes, f"ventas_por_mes.{formato}"),
+        grafico_top(analisis.ventas_prod, f"top5_productos.{formato}"),
+    ]
+    if por_producto or por_mes:
+        from ventas_rollup import cargar_rollup
+        rollup = cargar_rollup(archivo, filas_por_bloque)
+        if por_producto:
+            graficos += graficos_por_producto(rollup, carpeta, formato)
+        if por_mes:
+            graficos += graficos_por_mes(rollup, carpeta, formato)
+    return renderizar(graficos, dpi, procesos)
+
+
+def imprimir_informe(analisis):
+    from ventas import destacados
+
+    # 1. Datos cargados
+    print("=" * 60)
+    print("ANÁLISIS DE VENTAS")
+    print("=" * 60)
+
+    # Verificar tipos de datos
+    print("\n📊 Información del dataset:")
+    print(f"Total de registros: {analisis.filas}")
+    print("\nTipos de datos:")
+    print(analisis.tipos)
+    print("\nPrimeras filas:")
+    print(analisis.primeras)
+
+    # 2. Ventas totales por mes
+    print("\n" + "=" * 60)
+    print("VENTAS POR MES")
+    print("=" * 60)
+
+    print("\nVentas totales por mes:")
+    print(analisis.ventas_por_mes.to_frame())
+    print(f"\nTotal general: {analisis.ventas_por_mes.sum():.2f} €")
+
+    # 3. Producto más vendido y con mayor ingresos
+    print("\n" + "=" * 60)
+    print("ANÁLISIS POR PRODUCTO")
+    print("=" * 60)
+
+    print("\nResumen por producto:")
+    print(analisis.ventas_prod)
+
+    mas_vendido, cantidad_total, mayor_ingreso, ingreso_total = destacados(analisis.ventas_prod)
+
+    print(f"\n🏆 Producto más vendido (en unidades): {mas_vendido}")
+    print(f"   Total: {cantidad_total} unidades")
+
+    print(f"\n💰 Producto con mayores ingresos: {mayor_ingreso}")
+    print(f"   Total: {ingreso_total:.2f} €")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Análisis de ventas por mes y por producto.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Ejemplos:
+  python main.py                                   # carga ventas.csv entero
+  python main.py -a ventas_100m.csv --streaming    # por bloques, memoria acotada
+  python main.py --streaming --filas-por-bloque 500000
+  python main.py -a ventas_100m.csv --workers 8          # 8 procesos
+  python main.py -a ventas_100m.csv --workers 0          # uno por núcleo
+  python main.py -a ventas_100m.csv --cache              # ventas_100m.csv.columnas
+  python main.py -a ventas_100m.csv --incremental        # ventas_100m.csv.estado
+  python main.py --formato svg --graficos-por-producto --graficos-por-mes
+  python main.py --informe json > resultados.json        # sin gráficos ni matplotlib
+        """
+    )
+    parser.add_argument("-a", "--archivo", default="ventas.csv", help="CSV de ventas (por defecto: ventas.csv)")
+    # Cada modo de lectura es un camino distinto: combinarlos no tiene sentido
+    lectura = parser.add_mutually_exclusive_group()
+    lectura.add_argument("--streaming", action="store_true",
+                         help="Leer el CSV por bloques sin cargarlo entero en memoria")
+    parser.add_argument("--filas-por-bloque", type=int, default=1_000_000,
+                        help="Filas por bloque con --streaming o --workers (por defecto: 1000000)")
+    lectura.add_argument("--workers", type=int, default=1,
+                         help="Procesos que agregan el archivo por rangos de bytes; 0 = uno por núcleo (por defecto: 1)")
+    lectura.add_argument("--cache", action="store_true",
+                         help="Usar (y crear si falta o está desfasada) la caché por columnas <archivo>.columnas")
+    lectura.add_argument("--incremental", action="store_true",
+                         help="Procesar solo las filas añadidas desde la última vez (estado en <archivo>.estado)")
+    parser.add_argument("--tipos-compactos", action="store_true",
+                        help="Leer con el esquema compacto (menos memoria y sin inferir tipos); "
+                             "solo con la lectura normal o --streaming")
+    parser.add_argument("--formato", choices=["png", "svg", "pdf"], default="png",
+                        help="Formato de los gráficos (por defecto: png)")
+    parser.add_argument("--dpi", type=int, default=150, help="Resolución de los gráficos (por defecto: 150)")
+    parser.add_argument("--graficos-por-producto", action="store_true",
+                        help="Además, un gráfico de ventas por mes de cada producto en --carpeta-graficos")
+    parser.add_argument("--graficos-por-mes", action="store_true",
+                        help="Además, un gráfico del top 5 de productos de cada mes en --carpeta-graficos")
+    parser.add_argument("--carpeta-graficos", default="graficos",
+                        help="Carpeta de los gráficos por producto y por mes (por defecto: graficos)")
+    parser.add_argument("--procesos-graficos", type=int,
+                        help="Procesos para dibujar los gráficos pendientes (por defecto: uno por núcleo)")
+    parser.add_argument("--no-graficos", action="store_true", help="Solo el informe, sin gráficos")
+    parser.add_argument("--informe", choices=["texto", "json"], default="texto",
+                        help="texto: informe legible; json: resultados en JSON por la salida estándar, "
+                             "sin gráficos (por defecto: texto)")
+    args = parser.parse_args(argv)
+    if args.tipos_compactos and (args.workers != 1 or args.cache or args.incremental):
+        parser.error("--tipos-compactos no se puede combinar con --workers, --cache ni --incremental")
+
+    analisis = analizar_ventas(args.archivo, args.streaming, args.filas_por_bloque, args.workers,
+                               args.cache, args.incremental, args.tipos_compactos)
+    if args.informe == 'json':
+        print(json.dumps(resultados(analisis), ensure_ascii=False, indent=2))
+        return
+    imprimir_informe(analisis)
+    if args.no_graficos:
+        return
+
+    # 4. Gráficos
+    print("\n" + "=" * 60)
+    print("GENERANDO GRÁFICOS...")
+    print("=" * 60)
+    resultado = generar_graficos(analisis, args.archivo, args.formato, args.dpi, args.graficos_por_producto,
+                                 args.graficos_por_mes, args.carpeta_graficos, args.procesos_graficos,
+                                 args.filas_por_bloque)
+    for ruta, dibujado in resultado:
+        print(f"✅ Gráfico guardado: {ruta}" if dibujado else f"⏭️  Gráfico al día: {ruta}")
+
+    print("\n" + "=" * 60)
+    print("✅ ANÁLISIS COMPLETADO")
+    print("=" * 60)
+    print("\nArchivos generados:")
+    for ruta, _ in resultado[:2]:
+        print(f"  - {ruta}")
+    if len(resultado) > 2:
+        print(f"  - {len(resultado) - 2} gráficos en {os.path.join(args.carpeta_graficos, '')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Métricas del gestor de tareas en formato de texto de Prometheus.
+
+Implementación mínima sin dependencias: contadores, histogramas con etiquetas e
+indicadores que se calculan al exportar. Cada proceso lleva sus propias
+métricas; con varios workers, Prometheus debe consultar cada uno o sumarlas.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Límites (en segundos) de los cubos de los histogramas de duración
+LIMITES_DURACION = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _etiquetas(nombres, valores, extra=()):
+    pares = list(zip(nombres, valores)) + list(extra)
+    if not pares:
+        return ''
+    texto = ','.join(f'{n}="{_escapar(str(v))}"' for n, v in pares)
+    return '{' + texto + '}'
+
+
+def _escapar(valor):
+    return valor.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _numero(valor):
+    if valor == float('inf'):
+        return '+Inf'
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Contador:
+    """Valor que solo crece, uno por combinación de etiquetas."""
+
+    tipo = 'counter'
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._valores = {}
+        self._bloqueo = threading.Lock()
+
+    def incrementar(self, *valores, cantidad=1):
+        with self._bloqueo:
+            self._valores[valores] = self._valores.get(valores, 0) + cantidad
+
+    def muestras(self):
+        with self._bloqueo:
+            valores = dict(self._valores)
+        for clave, valor in sorted(valores.items()):
+            yield self.nombre, _etiquetas(self.etiquetas, clave), valor
+
+
+class Histograma:
+    """Distribución de duraciones en cubos acumulados, una por combinación de etiquetas."""
+
+    tipo = 'histogram'
+
+    def __init__(self, nombre, ayuda, etiquetas=(), limites=LIMITES_DURACION):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.limites = tuple(limites)
+        self._series = {}  # valores de etiquetas -> [cubos..., suma, cuenta]
+        self._bloqueo = threading.Lock()
+
+    def observar(self, valor, *valores):
+        i = bisect_left(self.limites, valor)
+        with self._bloqueo:
+            serie = self._series.get(valores)
+            if serie is None:
+                serie = self._series[valores] = [0] * (len(self.limites) + 3)
+            serie[i] += 1
+            serie[-2] += valor
+            serie[-1] += 1
+
+    @contextmanager
+    def medir(self, *valores):
+        """Observa la duración del bloque with."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(time.perf_counter() - inicio, *valores)
+
+    def muestras(self):
+        with self._bloqueo:
+            series = {clave: list(serie) for clave, serie in self._series.items()}
+        for clave, serie in sorted(series.items()):
+            acumulado = 0
+            for limite, cuenta in zip(self.limites + (float('inf'),), serie):
+                acumulado += cuenta
+                yield self.nombre + '_bucket', _etiquetas(self.etiquetas, clave, [('le', _numero(limite))]), acumulado
+            yield self.nombre + '_sum', _etiquetas(self.etiquetas, clave), serie[-2]
+            yield self.nombre + '_count', _etiquetas(self.etiquetas, clave), serie[-1]
+
+
+class Indicador:
+    """Valores que se calculan al exportar: funcion() devuelve {(valores de etiquetas): valor}."""
+
+    tipo = 'gauge'
+
+    def __init__(self, nombre, ayuda, etiquetas, funcion):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.funcion = funcion
+
+    def muestras(self):
+        for clave, valor in sorted(self.funcion().items()):
+            yield self.nombre, _etiquetas(self.etiquetas, clave), valor
+
+
+class Registro:
+    """Conjunto de métricas que se exportan juntas."""
+
+    def __init__(self):
+        self._metricas = []
+
+    def registrar(self, metrica):
+        self._metricas.append(metrica)
+        return metrica
+
+    def exportar(self):
+        """Texto en el formato de exposición de Prometheus (versión 0.0.4)."""
+        lineas = []
+        for metrica in self._metricas:
+            lineas.append(f'# HELP {metrica.nombre} {metrica.ayuda}')
+            lineas.append(f'# TYPE {metrica.nombre} {metrica.tipo}')
+            for nombre, etiquetas, valor in metrica.muestras():
+                lineas.append(f'{nombre}{etiquetas} {_numero(valor)}')
+        return '\n'.join(lineas) + '\n'
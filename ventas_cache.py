@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Caché binaria por columnas de un CSV de ventas.
+
+La primera vez se lee el CSV por bloques y se guardan las columnas ya
+convertidas junto al archivo (ventas.csv -> ventas.csv.columnas): la fecha como
+días desde 1970 (int32), el producto como código de un catálogo (int32) y
+cantidad y precio como arrays de ancho fijo. Las siguientes veces el archivo se
+mapea con mmap y las columnas son vistas NumPy sobre el mapa, sin copiar ni
+volver a interpretar texto.
+
+La caché lleva la clave del CSV del que salió (tamaño, mtime y un hash del
+contenido); si el CSV cambia se regenera sola. El hash cubre el primer y el
+último MiB para no tener que leer entero un archivo de varios GB en cada
+comprobación: cualquier cambio normal altera también el tamaño o el mtime.
+
+    python ventas_cache.py ventas.csv          # crear o comprobar la caché
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from ventas import Agregados, informe, leer_ventas
+
+EXTENSION = '.columnas'
+MAGICO = b'VENTASLE' if sys.byteorder == 'little' else b'VENTASBE'
+CABECERA = struct.Struct('=8sq')  # mágico, bytes de los metadatos JSON
+VERSION = 2
+BYTES_HASH = 1 << 20
+
+# Vistas sobre la caché; categorias traduce los códigos de producto
+Columnas = namedtuple('Columnas', ['dias', 'productos', 'cantidad', 'precio', 'categorias', 'tipos'])
+NOMBRES = ('dias', 'productos', 'cantidad', 'precio')
+
+
+def ruta_cache(ruta):
+    return ruta + EXTENSION
+
+
+def clave(ruta):
+    """Identifica el contenido de ruta: {tamano, mtime_ns, hash}."""
+    with open(ruta, 'rb') as f:
+        estado = os.fstat(f.fileno())
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f.read(BYTES_HASH))
+        if estado.st_size > 2 * BYTES_HASH:
+            f.seek(-BYTES_HASH, os.SEEK_END)
+        h.update(f.read(BYTES_HASH))
+    return {'tamano': estado.st_size, 'mtime_ns': estado.st_mtime_ns, 'hash': h.hexdigest()}
+
+
+def _relleno(n):
+    return -n % 8
+
+
+def escribir_arrays(destino, metadatos, arrays, magico=MAGICO):
+    """
+    Escribe de forma atómica metadatos (JSON) y arrays {nombre: lista de trozos}
+    concatenando los trozos de cada uno. Los tipos y formas de los arrays se
+    añaden a metadatos['arrays'] para que mapear_arrays() pueda leerlos.
+    """
+    metadatos = dict(metadatos)
+    metadatos['arrays'] = {}
+    for nombre, trozos in arrays.items():
+        tipo = np.result_type(*trozos)
+        forma = list(trozos[0].shape)
+        forma[0] = sum(len(t) for t in trozos)
+        metadatos['arrays'][nombre] = [tipo.str, forma]
+    texto = json.dumps(metadatos, ensure_ascii=False).encode('utf-8')
+    temporal = f'{destino}.{os.getpid()}.tmp'
+    with open(temporal, 'wb') as f:
+        f.write(CABECERA.pack(magico, len(texto)))
+        f.write(texto)
+        f.write(bytes(_relleno(f.tell())))
+        for nombre, trozos in arrays.items():
+            tipo = np.dtype(metadatos['arrays'][nombre][0])
+            for trozo in trozos:
+                f.write(np.ascontiguousarray(trozo, dtype=tipo).tobytes())
+            f.write(bytes(_relleno(f.tell())))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, destino)
+
+
+def mapear_arrays(ruta, magico=MAGICO):
+    """
+    Mapea un archivo de escribir_arrays() y devuelve (metadatos, {nombre: vista}),
+    o None si no existe o no es de esta arquitectura.
+    """
+    try:
+        with open(ruta, 'rb') as f:
+            mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError):
+        return None
+    if len(mapa) < CABECERA.size:
+        return None
+    magico_leido, longitud = CABECERA.unpack_from(mapa)
+    if magico_leido != magico:
+        return None
+    metadatos = json.loads(mapa[CABECERA.size:CABECERA.size + longitud])
+    if 'arrays' not in metadatos:  # formato anterior
+        return None
+    posicion = CABECERA.size + longitud
+    posicion += _relleno(posicion)
+    vistas = {}
+    for nombre, (tipo, forma) in metadatos['arrays'].items():
+        tipo = np.dtype(tipo)
+        cuenta = int(np.prod(forma))
+        vistas[nombre] = np.frombuffer(mapa, dtype=tipo, count=cuenta, offset=posicion).reshape(forma)
+        posicion += cuenta * tipo.itemsize
+        posicion += _relleno(posicion)
+    return metadatos, vistas
+
+
+def crear_cache(ruta, filas_por_bloque=1_000_000):
+    """Lee el CSV por bloques, escribe la caché de forma atómica y devuelve su ruta."""
+    clave_csv = clave(ruta)
+    categorias = {}
+    trozos = {nombre: [] for nombre in NOMBRES}
+    tipos = None
+    for df in leer_ventas(ruta, chunksize=filas_por_bloque):
+        if tipos is None:
+            tipos = {columna: str(tipo) for columna, tipo in df.dtypes.items()}
+        codigos, unicos = pd.factorize(df['producto'])
+        traduccion = np.array([categorias.setdefault(p, len(categorias)) for p in unicos], dtype=np.int32)
+        trozos['dias'].append(df['fecha'].to_numpy().astype('datetime64[D]').astype(np.int32))
+        trozos['productos'].append(traduccion[codigos])
+        trozos['cantidad'].append(pd.to_numeric(df['cantidad']).to_numpy())
+        trozos['precio'].append(pd.to_numeric(df['precio']).to_numpy())
+    if tipos is None:
+        raise ValueError("El archivo de ventas no tiene filas")
+
+    destino = ruta_cache(ruta)
+    escribir_arrays(destino, {
+        'version': VERSION,
+        'clave': clave_csv,
+        'categorias': list(categorias),
+        'tipos': tipos,
+    }, trozos)
+    return destino
+
+
+def leer_cache(ruta, comprobar=True):
+    """
+    Mapea la caché de ruta y devuelve Columnas, o None si no existe, es de otra
+    versión o (con comprobar) ya no corresponde al CSV.
+    """
+    leido = mapear_arrays(ruta_cache(ruta))
+    if leido is None:
+        return None
+    metadatos, vistas = leido
+    if metadatos.get('version') != VERSION or (comprobar and metadatos['clave'] != clave(ruta)):
+        return None
+    return Columnas(categorias=metadatos['categorias'], tipos=metadatos['tipos'], **vistas)
+
+
+def cargar_columnas(ruta, filas_por_bloque=1_000_000):
+    """Columnas de ruta desde la caché, creándola o regenerándola si hace falta."""
+    columnas = leer_cache(ruta)
+    if columnas is None:
+        crear_cache(ruta, filas_por_bloque)
+        columnas = leer_cache(ruta, comprobar=False)
+    return columnas
+
+
+def primeras_filas(columnas, n=5):
+    """Las n primeras filas como DataFrame con los tipos del CSV original."""
+    fechas = columnas.dias[:n].astype('datetime64[D]')
+    productos = np.array(columnas.categorias, dtype=object)[columnas.productos[:n]]
+    df = pd.DataFrame({'fecha': fechas, 'producto': productos,
+                       'cantidad': columnas.cantidad[:n], 'precio': columnas.precio[:n]})
+    return df.astype(columnas.tipos)
+
+
+def agregar_columnas(columnas):
+    """Agregados del informe calculados directamente sobre las columnas."""
+    dias = columnas.dias
+    ingreso = columnas.cantidad * columnas.precio
+    # Mes (ordinal de Period 'M') de cada día del rango, consultado por tabla
+    primero = int(dias.min()) if len(dias) else 0
+    rango = np.arange(primero, int(dias.max()) + 1 if len(dias) else 0).astype('datetime64[D]')
+    tabla = rango.astype('datetime64[M]').astype(np.int64)
+    meses = tabla[dias - primero]
+
+    por_mes = pd.Series(ingreso).groupby(meses).sum()
+    por_mes.index = pd.PeriodIndex.from_ordinals(por_mes.index.to_numpy(), freq='M', name='mes')
+    por_mes.name = 'ingreso'
+
+    por_producto = pd.DataFrame({'cantidad': columnas.cantidad, 'ingreso': ingreso}).groupby(columnas.productos).sum()
+    por_producto.index = pd.Index(np.array(columnas.categorias, dtype=object)[por_producto.index],
+                                  dtype=columnas.tipos['producto'], name='producto')
+    # Mismo orden que agrupar por el texto del producto
+    por_producto = por_producto.sort_index()
+    return Agregados(por_mes, por_producto, len(dias))
+
+
+def analizar_con_cache(ruta, filas_por_bloque=1_000_000):
+    """Como ventas.analizar(), pero leyendo de la caché por columnas."""
+    columnas = cargar_columnas(ruta, filas_por_bloque)
+    primeras = primeras_filas(columnas)
+    return informe(agregar_columnas(columnas), primeras.dtypes, primeras)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crea o comprueba la caché por columnas de un CSV de ventas.")
+    parser.add_argument("archivo", nargs="?", default="ventas.csv", help="CSV de ventas (por defecto: ventas.csv)")
+    parser.add_argument("--filas-por-bloque", type=int, default=1_000_000,
+                        help="Filas que se leen de una vez al crear la caché (por defecto: 1000000)")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    columnas = leer_cache(args.archivo)
+    if columnas is not None:
+        print(f"✅ Caché al día: {ruta_cache(args.archivo)} ({len(columnas.dias)} filas, "
+              f"comprobada en {time.perf_counter() - inicio:.3f} s)")
+        return
+    crear_cache(args.archivo, args.filas_por_bloque)
+    print(f"✅ Caché creada: {ruta_cache(args.archivo)} en {time.perf_counter() - inicio:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
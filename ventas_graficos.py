@@ -0,0 +1,130 @@
+"""
+Etapa de gráficos del análisis de ventas.
+
+Cada gráfico se describe con un Grafico (tipo, título, etiquetas y valores ya
+calculados), así se puede resumir con un hash y enviar a otro proceso. Al
+renderizar se compara el hash con el guardado en un manifiesto
+(.graficos.json): si el archivo existe y sus datos y opciones no han cambiado,
+no se vuelve a dibujar. Los pendientes se dibujan en paralelo con un
+ProcessPoolExecutor cuando hay varios. matplotlib solo se importa al dibujar,
+de modo que una ejecución sin cambios no lo carga.
+"""
+
+import hashlib
+import json
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+MANIFIESTO = '.graficos.json'
+VERSION = 1  # cambiarla si cambia el aspecto de los gráficos, para invalidar los ya dibujados
+
+# tipo: 'meses' (barras azules con etiquetas rotadas) o 'productos' (barras con el valor encima)
+Grafico = namedtuple('Grafico', ['ruta', 'tipo', 'titulo', 'etiquetas', 'valores'])
+
+
+def grafico_meses(ventas_por_mes, ruta, titulo="Ventas por Mes"):
+    """Barras de ingresos por mes a partir de una Series con índice Period."""
+    return Grafico(ruta, 'meses', titulo, [str(m) for m in ventas_por_mes.index],
+                   [float(v) for v in ventas_por_mes.to_numpy()])
+
+
+def grafico_top(ventas_prod, ruta, n=5, titulo="Top 5 Productos por Ingresos"):
+    """Barras de los n productos con más ingresos."""
+    top = ventas_prod.nlargest(n, 'ingreso')
+    return Grafico(ruta, 'productos', titulo, [str(p) for p in top.index],
+                   [float(v) for v in top['ingreso'].to_numpy()])
+
+
+def graficos_por_producto(rollup, carpeta, formato):
+    """Un gráfico de ingresos por mes para cada producto del rollup (ventas_rollup.Rollup)."""
+    return [grafico_meses(rollup.por_mes(producto=p)['ingreso'],
+                          os.path.join(carpeta, f'producto_{p}.{formato}'), f"Ventas por Mes · {p}")
+            for p in rollup.productos]
+
+
+def graficos_por_mes(rollup, carpeta, formato, n=5):
+    """Un gráfico de los n productos con más ingresos para cada mes del rollup."""
+    graficos = []
+    for mes in rollup.por_mes().index:
+        inicio = mes.start_time.date()
+        fin = mes.end_time.date()
+        graficos.append(grafico_top(rollup.por_producto(inicio, fin),
+                                    os.path.join(carpeta, f'mes_{mes}.{formato}'), n,
+                                    f"Top {n} Productos por Ingresos · {mes}"))
+    return graficos
+
+
+def huella(grafico, dpi):
+    """Hash de los datos y opciones del gráfico."""
+    datos = json.dumps([VERSION, dpi, *grafico], ensure_ascii=False)
+    return hashlib.blake2b(datos.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def dibujar(grafico, dpi=150):
+    """Dibuja y guarda un gráfico; el formato sale de la extensión de la ruta."""
+    import matplotlib
+    matplotlib.use('Agg')  # Backend no interactivo
+    import matplotlib.pyplot as plt
+
+    carpeta = os.path.dirname(grafico.ruta)
+    if carpeta:
+        os.makedirs(carpeta, exist_ok=True)
+    plt.figure(figsize=(10, 6))
+    if grafico.tipo == 'meses':
+        # Mismo dibujo que Series.plot del análisis original
+        import pandas as pd
+        pd.Series(grafico.valores, index=grafico.etiquetas).plot(kind='bar', color='steelblue', edgecolor='black')
+        plt.xlabel("Mes", fontsize=12)
+        plt.ylabel("Ventas (€)", fontsize=12)
+        plt.xticks(rotation=45)
+    else:
+        plt.bar(grafico.etiquetas, grafico.valores, color='coral', edgecolor='black')
+        plt.ylabel("Ingresos (€)", fontsize=12)
+        plt.xlabel("Producto", fontsize=12)
+        plt.xticks(rotation=0)
+        # Añadir valores en las barras
+        for i, v in enumerate(grafico.valores):
+            plt.text(i, v, f'{v:.0f}€', ha='center', va='bottom', fontweight='bold')
+    plt.title(grafico.titulo, fontsize=16, fontweight='bold')
+    plt.grid(axis='y', alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(grafico.ruta, dpi=dpi, bbox_inches='tight')
+    plt.close()
+    return grafico.ruta
+
+
+def _leer_manifiesto(ruta):
+    try:
+        with open(ruta, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def renderizar(graficos, dpi=150, procesos=None, manifiesto=MANIFIESTO):
+    """
+    Dibuja los gráficos que no estén al día y devuelve [(ruta, dibujado)] en el
+    orden recibido. procesos=None usa uno por núcleo; con 1 no se crea pool.
+    """
+    hechos = _leer_manifiesto(manifiesto)
+    huellas = [huella(g, dpi) for g in graficos]
+    pendientes = [g for g, h in zip(graficos, huellas)
+                  if hechos.get(g.ruta) != h or not os.path.exists(g.ruta)]
+
+    procesos = min(procesos or os.cpu_count() or 1, len(pendientes))
+    if procesos > 1:
+        with ProcessPoolExecutor(procesos) as ejecutor:
+            list(ejecutor.map(dibujar, pendientes, [dpi] * len(pendientes)))
+    else:
+        for g in pendientes:
+            dibujar(g, dpi)
+
+    if pendientes:
+        hechos.update((g.ruta, h) for g, h in zip(graficos, huellas))
+        temporal = f'{manifiesto}.{os.getpid()}.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(hechos, f, ensure_ascii=False, indent=2)
+        os.replace(temporal, manifiesto)
+    dibujados = {g.ruta for g in pendientes}
+    return [(g.ruta, g.ruta in dibujados) for g in graficos]
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Procesamiento incremental de un CSV de ventas al que solo se añaden filas.
+
+Junto al CSV se guarda un estado (ventas.csv.estado, JSON) con los agregados
+del informe y un punto de control: hasta qué byte se procesó, un hash de la
+cabecera y otro de los últimos bytes procesados. En cada ejecución solo se leen
+las líneas completas añadidas desde entonces y se suman a los agregados. Si el
+archivo se ha reescrito (es más corto o no coinciden los hashes), se recalcula
+todo desde el principio.
+
+    python ventas_incremental.py ventas.csv        # actualizar el estado
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from ventas import Agregados, combinar, informe, leer_ventas, resumir
+from ventas_paralelo import LectorRango
+
+EXTENSION = '.estado'
+VERSION = 1
+BYTES_COLA = 4096  # bytes procesados que se comprueban antes de continuar
+
+
+def ruta_estado(ruta):
+    return ruta + EXTENSION
+
+
+def _hash(datos):
+    return hashlib.blake2b(datos, digest_size=16).hexdigest()
+
+
+def _fin_de_lineas(f, tamano, inicio):
+    """Posición justo después del último salto de línea (las líneas a medias se dejan para otra vez)."""
+    posicion = tamano
+    while posicion > inicio:
+        desde = max(inicio, posicion - 65536)
+        f.seek(desde)
+        trozo = f.read(posicion - desde)
+        salto = trozo.rfind(b'\n')
+        if salto >= 0:
+            return desde + salto + 1
+        posicion = desde
+    return inicio
+
+
+def _guardar(ruta, estado):
+    """Escribe el estado de forma atómica (temporal + fsync + renombrar)."""
+    destino = ruta_estado(ruta)
+    temporal = f'{destino}.{os.getpid()}.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(estado, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, destino)
+
+
+def _leer_estado(ruta):
+    try:
+        with open(ruta_estado(ruta), encoding='utf-8') as f:
+            estado = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    return estado if estado.get('version') == VERSION else None
+
+
+def _a_json(total, tipos, primeras):
+    """Agregados, tipos y primeras filas como valores JSON (los float conservan todos sus dígitos)."""
+    return {
+        'filas': total.filas,
+        'por_mes': {str(mes): float(v) for mes, v in total.por_mes.items()},
+        'por_producto': {p: [int(fila.cantidad), float(fila.ingreso)] for p, fila in total.por_producto.iterrows()},
+        'tipos': {columna: str(tipo) for columna, tipo in tipos.items()},
+        'primeras': primeras.astype(str).to_dict('list'),
+    }
+
+
+def _desde_json(datos):
+    """Inverso de _a_json: (Agregados, primeras filas)."""
+    tipos = datos['tipos']
+    por_mes = pd.Series(list(datos['por_mes'].values()), dtype=np.float64, name='ingreso',
+                        index=pd.PeriodIndex(list(datos['por_mes']), freq='M', name='mes'))
+    valores = list(datos['por_producto'].values())
+    por_producto = pd.DataFrame({'cantidad': np.array([v[0] for v in valores], dtype=tipos['cantidad']),
+                                 'ingreso': np.array([v[1] for v in valores], dtype=np.float64)},
+                                index=pd.Index(list(datos['por_producto']), dtype=tipos['producto'], name='producto'))
+    primeras = pd.DataFrame(datos['primeras']).astype(tipos)
+    return Agregados(por_mes, por_producto, datos['filas']), primeras
+
+
+def actualizar(ruta, filas_por_bloque=1_000_000):
+    """
+    Pone al día el estado de ruta y devuelve (Analisis, filas nuevas, recalculado).
+
+    recalculado es True si no había estado válido o el archivo se reescribió.
+    """
+    estado = _leer_estado(ruta)
+    with open(ruta, 'rb') as f:
+        cabecera = f.readline()
+        inicio_datos = f.tell()
+        tamano = os.fstat(f.fileno()).st_size
+        nombres = cabecera.decode('utf-8').rstrip('\r\n').split(',')
+
+        recalculado = True
+        if estado is not None and estado['hash_cabecera'] == _hash(cabecera) and estado['offset'] <= tamano:
+            offset = estado['offset']
+            f.seek(max(inicio_datos, offset - BYTES_COLA))
+            recalculado = _hash(f.read(offset - f.tell())) != estado['hash_cola']
+        if recalculado:
+            estado, offset = None, inicio_datos
+        fin = _fin_de_lineas(f, tamano, offset)
+        f.seek(max(inicio_datos, fin - BYTES_COLA))
+        hash_cola = _hash(f.read(fin - f.tell()))
+
+    parcial = tipos = primeras = None
+    if fin > offset:
+        with LectorRango(ruta, offset, fin) as lector:
+            bloques = leer_ventas(lector, header=None, names=nombres, chunksize=filas_por_bloque)
+            parcial, tipos, primeras = resumir(bloques)
+    if estado is not None:
+        anterior, primeras = _desde_json(estado['agregados'])
+        tipos = primeras.dtypes
+        total = anterior if parcial is None else combinar([anterior, parcial])
+    else:
+        total = parcial
+    nuevas = parcial.filas if parcial is not None else 0
+    analisis = informe(total, tipos, primeras)
+
+    _guardar(ruta, {
+        'version': VERSION,
+        'offset': fin,
+        'hash_cabecera': _hash(cabecera),
+        'hash_cola': hash_cola,
+        'agregados': _a_json(total, tipos, primeras),
+    })
+    return analisis, nuevas, recalculado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Actualiza los agregados de ventas con las filas añadidas al CSV.")
+    parser.add_argument("archivo", nargs="?", default="ventas.csv", help="CSV de ventas (por defecto: ventas.csv)")
+    parser.add_argument("--filas-por-bloque", type=int, default=1_000_000,
+                        help="Filas que se leen de una vez (por defecto: 1000000)")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    analisis, nuevas, recalculado = actualizar(args.archivo, args.filas_por_bloque)
+    modo = "recalculado desde el principio" if recalculado else "incremental"
+    print(f"✅ {ruta_estado(args.archivo)} al día ({modo}): {nuevas} filas nuevas, "
+          f"{analisis.filas} en total, {time.perf_counter() - inicio:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Agregación de ventas en paralelo por rangos de bytes.
+
+El CSV se parte en tantos rangos como procesos, alineados a inicio de línea.
+Cada proceso abre el archivo, lee solo su rango por bloques y devuelve los
+agregados parciales (ventas.Agregados), que se combinan en el mismo orden en
+que aparecen en el archivo. Ningún proceso carga el archivo entero ni se
+envían filas entre procesos: solo viajan los agregados.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from ventas import combinar, informe, leer_ventas, resumir
+
+
+def rangos_de_bytes(ruta, partes):
+    """
+    Devuelve (nombres de columna, [(inicio, fin), ...]) con los rangos de datos
+    (sin cabecera) de ruta, cada uno empezando al principio de una línea.
+    """
+    with open(ruta, 'rb') as f:
+        cabecera = f.readline()
+        nombres = cabecera.decode('utf-8').rstrip('\r\n').split(',')
+        inicio = f.tell()
+        fin = os.fstat(f.fileno()).st_size
+        cortes = [inicio]
+        for i in range(1, partes):
+            posicion = inicio + (fin - inicio) * i // partes
+            if posicion <= cortes[-1]:
+                continue
+            # Avanzar hasta el principio de la línea siguiente (si no lo es ya)
+            f.seek(posicion - 1)
+            f.readline()
+            if cortes[-1] < f.tell() < fin:
+                cortes.append(f.tell())
+        cortes.append(fin)
+    return nombres, [(a, b) for a, b in zip(cortes, cortes[1:]) if b > a]
+
+
+class LectorRango:
+    """Archivo de solo lectura limitado a los bytes [inicio, fin) de ruta."""
+
+    def __init__(self, ruta, inicio, fin):
+        self._archivo = open(ruta, 'rb')
+        self._archivo.seek(inicio)
+        self._restantes = fin - inicio
+
+    def read(self, tamano=-1):
+        if tamano is None or tamano < 0 or tamano > self._restantes:
+            tamano = self._restantes
+        datos = self._archivo.read(tamano)
+        self._restantes -= len(datos)
+        return datos
+
+    def close(self):
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def agregar_rango(ruta, nombres, inicio, fin, filas_por_bloque):
+    """Proceso de trabajo: (Agregados, tipos, primeras filas) del rango [inicio, fin)."""
+    with LectorRango(ruta, inicio, fin) as lector:
+        bloques = leer_ventas(lector, header=None, names=nombres, chunksize=filas_por_bloque)
+        return resumir(bloques)
+
+
+def analizar_en_paralelo(ruta, procesos=None, filas_por_bloque=1_000_000):
+    """Como ventas.analizar(), repartiendo el archivo entre procesos (por defecto, uno por núcleo)."""
+    procesos = procesos or os.cpu_count() or 1
+    nombres, rangos = rangos_de_bytes(ruta, procesos)
+    if not rangos:
+        raise ValueError("El archivo de ventas no tiene filas")
+    argumentos = [(ruta, nombres, a, b, filas_por_bloque) for a, b in rangos]
+    if len(rangos) == 1:
+        resultados = [agregar_rango(*argumentos[0])]
+    else:
+        with ProcessPoolExecutor(min(procesos, len(rangos))) as ejecutor:
+            resultados = list(ejecutor.map(agregar_rango, *zip(*argumentos)))
+    _, tipos, primeras = resultados[0]
+    total = combinar(parcial for parcial, _, _ in resultados)
+    return informe(total, tipos, primeras)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Resumen producto × día con sumas acumuladas para consultar rangos de fechas.
+
+Se calcula una vez a partir de la caché por columnas (ventas_cache) y se guarda
+junto al CSV (ventas.csv -> ventas.csv.rollup). Para cada producto guarda la
+cantidad y el ingreso acumulados hasta cada día, así el total de cualquier
+rango es una resta: O(1) por producto, O(productos) para un top y O(meses)
+para el desglose mensual, sin volver a leer el CSV. Se regenera solo cuando
+cambia la clave del CSV.
+
+    python ventas_rollup.py total --desde 2024-01-01 --hasta 2024-03-31 -p C
+    python ventas_rollup.py top -n 5 --desde 2024-06-01
+    python ventas_rollup.py meses -p A
+"""
+
+import argparse
+import sys
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from ventas_cache import cargar_columnas, clave, escribir_arrays, mapear_arrays
+
+EXTENSION = '.rollup'
+MAGICO = b'ROLLUPLE' if sys.byteorder == 'little' else b'ROLLUPBE'
+VERSION = 1
+
+
+def ruta_rollup(ruta):
+    return ruta + EXTENSION
+
+
+def crear_rollup(ruta, filas_por_bloque=1_000_000):
+    """Calcula el resumen de ruta (creando la caché por columnas si falta) y lo guarda."""
+    columnas = cargar_columnas(ruta, filas_por_bloque)
+    primero = int(columnas.dias.min())
+    num_dias = int(columnas.dias.max()) - primero + 1
+    num_productos = len(columnas.categorias)
+
+    # Sumas por celda producto × día y después acumuladas por día, con un 0 delante
+    celda = columnas.productos.astype(np.int64) * num_dias + (columnas.dias - primero)
+    forma = (num_productos, num_dias)
+    acumulados = {}
+    for nombre, pesos, tipo in (('cantidad', columnas.cantidad, np.int64),
+                                ('ingreso', columnas.cantidad * columnas.precio, np.float64)):
+        suma = np.bincount(celda, weights=pesos, minlength=num_productos * num_dias).reshape(forma)
+        acumulado = np.zeros((num_productos, num_dias + 1), dtype=tipo)
+        np.cumsum(suma.astype(tipo), axis=1, out=acumulado[:, 1:])
+        acumulados[nombre] = [acumulado]
+        acumulados['total_' + nombre] = [acumulado.sum(axis=0)]
+
+    escribir_arrays(ruta_rollup(ruta), {
+        'version': VERSION,
+        'clave': clave(ruta),
+        'primer_dia': primero,
+        'productos': columnas.categorias,
+    }, acumulados, MAGICO)
+    return ruta_rollup(ruta)
+
+
+def cargar_rollup(ruta, filas_por_bloque=1_000_000):
+    """Rollup de ruta, creándolo o regenerándolo si falta o el CSV ha cambiado."""
+    for _ in range(2):
+        leido = mapear_arrays(ruta_rollup(ruta), MAGICO)
+        if leido is not None and leido[0].get('version') == VERSION and leido[0]['clave'] == clave(ruta):
+            return Rollup(*leido)
+        crear_rollup(ruta, filas_por_bloque)
+    raise RuntimeError(f"No se pudo crear {ruta_rollup(ruta)}")
+
+
+class Rollup:
+    """Consultas por rango de fechas (inclusivas; None = sin límite) sobre las sumas acumuladas."""
+
+    def __init__(self, metadatos, arrays):
+        self.primer_dia = np.datetime64(metadatos['primer_dia'], 'D')
+        self.productos = metadatos['productos']
+        self._posiciones = {p: i for i, p in enumerate(self.productos)}
+        self.num_dias = arrays['total_cantidad'].shape[0] - 1
+        self._arrays = arrays
+
+    def _limites(self, desde, hasta):
+        """Posiciones [inicio, fin) en las sumas acumuladas para el rango de días."""
+        inicio = 0 if desde is None else int((np.datetime64(desde, 'D') - self.primer_dia).astype(int))
+        fin = self.num_dias if hasta is None else int((np.datetime64(hasta, 'D') - self.primer_dia).astype(int)) + 1
+        inicio = min(max(inicio, 0), self.num_dias)
+        return inicio, min(max(fin, inicio), self.num_dias)
+
+    def _serie(self, nombre, producto):
+        if producto is None:
+            return self._arrays['total_' + nombre]
+        try:
+            return self._arrays[nombre][self._posiciones[producto]]
+        except KeyError:
+            raise KeyError(f"Producto desconocido: {producto}") from None
+
+    def total(self, desde=None, hasta=None, producto=None):
+        """(cantidad, ingreso) vendidos en el rango, de un producto o de todos."""
+        inicio, fin = self._limites(desde, hasta)
+        cantidad = self._serie('cantidad', producto)
+        ingreso = self._serie('ingreso', producto)
+        return int(cantidad[fin] - cantidad[inicio]), float(ingreso[fin] - ingreso[inicio])
+
+    def por_producto(self, desde=None, hasta=None):
+        """DataFrame cantidad/ingreso por producto en el rango (índice producto)."""
+        inicio, fin = self._limites(desde, hasta)
+        cantidad, ingreso = self._arrays['cantidad'], self._arrays['ingreso']
+        return pd.DataFrame({'cantidad': cantidad[:, fin] - cantidad[:, inicio],
+                             'ingreso': ingreso[:, fin] - ingreso[:, inicio]},
+                            index=pd.Index(self.productos, name='producto'))
+
+    def top(self, n=5, desde=None, hasta=None, por='ingreso'):
+        """Los n productos con más ingreso (o cantidad) en el rango."""
+        return self.por_producto(desde, hasta).nlargest(n, por)
+
+    def por_mes(self, desde=None, hasta=None, producto=None):
+        """DataFrame cantidad/ingreso por mes dentro del rango (índice mes)."""
+        inicio, fin = self._limites(desde, hasta)
+        if fin <= inicio:
+            return pd.DataFrame({'cantidad': [], 'ingreso': []}, index=pd.PeriodIndex([], freq='M', name='mes'))
+        primer_mes = (self.primer_dia + inicio).astype('datetime64[M]')
+        ultimo_mes = (self.primer_dia + fin - 1).astype('datetime64[M]')
+        meses = np.arange(primer_mes, ultimo_mes + 1)
+        # Primer día de cada mes (y del siguiente al último) como posición, recortado al rango
+        cortes = ((np.append(meses, ultimo_mes + 1).astype('datetime64[D]') - self.primer_dia).astype(np.int64))
+        cortes = np.clip(cortes, inicio, fin)
+        cantidad = self._serie('cantidad', producto)[cortes]
+        ingreso = self._serie('ingreso', producto)[cortes]
+        indice = pd.PeriodIndex.from_ordinals(meses.astype(np.int64), freq='M', name='mes')
+        return pd.DataFrame({'cantidad': np.diff(cantidad), 'ingreso': np.diff(ingreso)}, index=indice)
+
+
+def fecha(texto):
+    return date.fromisoformat(texto)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Consultas de ventas por rango de fechas sin releer el CSV.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Ejemplos:
+  python ventas_rollup.py crear                                  # (re)generar ventas.csv.rollup
+  python ventas_rollup.py total --desde 2024-01-01 --hasta 2024-03-31 -p C
+  python ventas_rollup.py top -n 10 --desde 2024-06-01 --por cantidad
+  python ventas_rollup.py meses -p A -a ventas_100m.csv
+        """
+    )
+    parser.add_argument("accion", choices=["crear", "total", "top", "meses"],
+                        help="crear: generar el resumen; total: cantidad e ingreso; "
+                             "top: mejores productos; meses: desglose mensual")
+    parser.add_argument("-a", "--archivo", default="ventas.csv", help="CSV de ventas (por defecto: ventas.csv)")
+    parser.add_argument("--desde", type=fecha, help="Primer día incluido (AAAA-MM-DD)")
+    parser.add_argument("--hasta", type=fecha, help="Último día incluido (AAAA-MM-DD)")
+    parser.add_argument("-p", "--producto", help="Limitar total o meses a un producto")
+    parser.add_argument("-n", type=int, default=5, help="Productos del top (por defecto: 5)")
+    parser.add_argument("--por", choices=["ingreso", "cantidad"], default="ingreso",
+                        help="Criterio del top (por defecto: ingreso)")
+    args = parser.parse_args()
+
+    if args.accion == 'crear':
+        print(f"✅ Resumen guardado: {crear_rollup(args.archivo)}")
+        return
+    rollup = cargar_rollup(args.archivo)
+    rango = f"{args.desde or 'inicio'} a {args.hasta or 'fin'}"
+    try:
+        if args.accion == 'total':
+            cantidad, ingreso = rollup.total(args.desde, args.hasta, args.producto)
+            print(f"📅 {rango} · {args.producto or 'todos los productos'}")
+            print(f"   {cantidad} unidades, {ingreso:.2f} €")
+        elif args.accion == 'top':
+            print(f"🏆 Top {args.n} por {args.por} ({rango}):")
+            print(rollup.top(args.n, args.desde, args.hasta, args.por))
+        else:
+            print(f"📊 Ventas por mes ({rango}) · {args.producto or 'todos los productos'}:")
+            print(rollup.por_mes(args.desde, args.hasta, args.producto))
+    except KeyError as e:
+        parser.error(e.args[0])
+
+
+if __name__ == "__main__":
+    main()